@@ -7,56 +7,210 @@ import json
 import os
 import sys
 import time
-import urllib.request
-import urllib.error
+import http.client
+import urllib.parse
 import base64
+import mmap
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson is much faster on large dashboard exports; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 GRAFANA_URL = os.environ.get("GRAFANA_URL", "http://grafana:3000")
 GRAFANA_USER = os.environ.get("GRAFANA_USER", "admin")
 GRAFANA_PASSWORD = os.environ.get("GRAFANA_PASSWORD", "admin123")
 DASHBOARDS_DIR = os.environ.get("DASHBOARDS_DIR", "/dashboards")
+# Credentials are fixed for the process lifetime: build the header once
+AUTH_HEADER = "Basic " + base64.b64encode(f"{GRAFANA_USER}:{GRAFANA_PASSWORD}".encode()).decode()
 MAX_WAIT = 60
-RETRY_INTERVAL = 2
+# Readiness polling: capped exponential backoff with jitter
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 5.0
+BACKOFF_JITTER = 0.5
+# Dashboard imports are idempotent (overwrite=True), so they can run concurrently
+MAX_WORKERS = 8
+# Dashboards at least this large are mmap'd instead of read into a bytes copy
+MMAP_THRESHOLD = 256 * 1024
+
+
+class GrafanaConnection:
+    """Keep-alive HTTP(S) connection to GRAFANA_URL, reused across requests."""
+
+    def __init__(self, base_url: str = GRAFANA_URL):
+        parts = urllib.parse.urlsplit(base_url)
+        self._https = parts.scheme == "https"
+        self._host = parts.netloc
+        self._prefix = parts.path.rstrip("/")
+        self._conn = None
+
+    def _connect(self, timeout):
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._host, timeout=timeout)
+
+    def request(self, method, path, body=None, headers=None, timeout=30):
+        """Send a request and return (status, body bytes).
+
+        Reopens the socket once if the server dropped the idle connection.
+        """
+        for attempt in (0, 1):
+            if self._conn is None:
+                self._conn = self._connect(timeout)
+            self._conn.timeout = timeout
+            if self._conn.sock is not None:
+                self._conn.sock.settimeout(timeout)
+            try:
+                self._conn.request(method, self._prefix + path, body=body, headers=headers or {})
+                resp = self._conn.getresponse()
+                # Drain the body so the connection can be reused
+                return resp.status, resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# http.client connections are not thread-safe: keep one per worker thread
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+
+
+def get_connection() -> GrafanaConnection:
+    """Return the calling thread's keep-alive connection, creating it once."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = GrafanaConnection()
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+
+def close_connections():
+    with _connections_lock:
+        for conn in _connections:
+            conn.close()
+        _connections.clear()
+
+
+def json_loads(data: bytes):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
-def wait_for_grafana():
-    """Wait for Grafana to be ready."""
-    url = f"{GRAFANA_URL}/api/health"
-    for i in range(MAX_WAIT // RETRY_INTERVAL):
+def json_dumps(obj) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def load_dashboard_file(path: str):
+    """Parse a dashboard JSON file, mmap'ing large exports so pages fault in lazily."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if ORJSON_AVAILABLE:
+                # orjson parses straight from the mapping, no intermediate bytes
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return json.loads(mm[:])
+
+
+def backoff_delay(attempt: int) -> float:
+    """Delay before retry number `attempt` (0-based), with jitter."""
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))
+    return delay * (1 + random.random() * BACKOFF_JITTER)
+
+
+class GrafanaError(Exception):
+    """Grafana answered with a status that retrying won't fix."""
+
+
+class GrafanaAuthError(GrafanaError):
+    """Grafana rejected GRAFANA_USER/GRAFANA_PASSWORD; retrying won't help."""
+
+
+def check_credentials(conn: GrafanaConnection) -> int:
+    """Return the HTTP status of an authenticated request; raise on bad credentials."""
+    status, _ = conn.request("GET", "/api/user", headers={"Authorization": AUTH_HEADER}, timeout=5)
+    if status == 401:
+        raise GrafanaAuthError("Grafana returned 401: bad GRAFANA_USER/GRAFANA_PASSWORD")
+    if status == 403:
+        raise GrafanaAuthError("Grafana returned 403: GRAFANA_USER lacks permission")
+    return status
+
+
+def wait_for_grafana() -> bool:
+    """Wait for Grafana to be ready, backing off exponentially up to MAX_WAIT.
+
+    Only 5xx responses (502/503/504 while starting) and connection errors are
+    retried. A 401/403 raises GrafanaAuthError and any other status raises
+    GrafanaError right away instead of waiting out MAX_WAIT.
+    """
+    conn = get_connection()
+    deadline = time.monotonic() + MAX_WAIT
+    attempt = 0
+    while True:
         try:
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                if resp.status == 200:
+            status, _ = conn.request("GET", "/api/health", timeout=5)
+            if status == 200:
+                # /api/health is unauthenticated: verify credentials before importing
+                status = check_credentials(conn)
+                if status == 200:
                     return True
-        except (urllib.error.URLError, OSError) as e:
+            if status < 500:
+                raise GrafanaError(f"Grafana returned unexpected HTTP {status}")
+            # 502/503/504: Grafana (or a proxy in front of it) still starting,
+            # or up but not healthy yet (e.g. still migrating)
+            print(f"Waiting for Grafana... (HTTP {status})")
+        except ConnectionRefusedError:
+            # Nothing listening yet - container still starting
+            print("Waiting for Grafana... (connection refused)")
+        except (http.client.HTTPException, OSError) as e:
             print(f"Waiting for Grafana... ({e})")
-        time.sleep(RETRY_INTERVAL)
-    return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(backoff_delay(attempt), remaining))
+        attempt += 1
 
 
 def import_dashboard(path: str) -> bool:
     """Import a dashboard JSON file into Grafana."""
-    with open(path) as f:
-        content = json.load(f)
+    conn = get_connection()
+    content = load_dashboard_file(path)
     # Remove id so Grafana accepts (overwrite uses uid)
     content.pop("id", None)
     # API expects {"dashboard": {...}, "overwrite": true}
     payload = {"dashboard": content, "overwrite": True}
-    data = json.dumps(payload).encode("utf-8")
-    url = f"{GRAFANA_URL}/api/dashboards/db"
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
-    credentials = base64.b64encode(f"{GRAFANA_USER}:{GRAFANA_PASSWORD}".encode()).decode()
-    req.add_header("Authorization", f"Basic {credentials}")
+    data = json_dumps(payload)
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": AUTH_HEADER,
+    }
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            if resp.status in (200, 201):
-                result = json.loads(resp.read().decode())
-                print(f"  Imported: {content.get('title', path)} (uid={result.get('uid', '?')})")
-                return True
-    except urllib.error.HTTPError as e:
-        body = e.read().decode() if e.fp else ""
-        print(f"  Failed {path}: {e.code} {body}")
+        status, body = conn.request("POST", "/api/dashboards/db", body=data, headers=headers, timeout=30)
+        if status in (200, 201):
+            result = json_loads(body)
+            print(f"  Imported: {content.get('title', path)} (uid={result.get('uid', '?')})")
+            return True
+        print(f"  Failed {path}: {status} {body.decode(errors='replace')}")
     except Exception as e:
         print(f"  Failed {path}: {e}")
     return False
@@ -64,20 +218,29 @@ def import_dashboard(path: str) -> bool:
 
 def main():
     print("Load-dashboard service starting...")
-    if not wait_for_grafana():
-        print("Grafana not ready within timeout", file=sys.stderr)
-        sys.exit(1)
-    print("Grafana is ready.")
-    if not os.path.isdir(DASHBOARDS_DIR):
-        print(f"No dashboards dir: {DASHBOARDS_DIR}")
-        return
-    count = 0
-    for name in sorted(os.listdir(DASHBOARDS_DIR)):
-        if name.endswith(".json"):
-            path = os.path.join(DASHBOARDS_DIR, name)
-            if import_dashboard(path):
-                count += 1
-    print(f"Done. Imported {count} dashboard(s).")
+    try:
+        try:
+            ready = wait_for_grafana()
+        except GrafanaError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        if not ready:
+            print("Grafana not ready within timeout", file=sys.stderr)
+            sys.exit(1)
+        print("Grafana is ready.")
+        if not os.path.isdir(DASHBOARDS_DIR):
+            print(f"No dashboards dir: {DASHBOARDS_DIR}")
+            return
+        paths = [os.path.join(DASHBOARDS_DIR, name)
+                 for name in sorted(os.listdir(DASHBOARDS_DIR))
+                 if name.endswith(".json")]
+        count = 0
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(paths))) as ex:
+                count = sum(ex.map(import_dashboard, paths))
+        print(f"Done. Imported {count} dashboard(s).")
+    finally:
+        close_connections()
 
 
 if __name__ == "__main__":
@@ -4,132 +4,160 @@ Video File Publisher - Stream video file to MediaMTX server via UDP or RTMP
 """
 
 import argparse
-import subprocess
 import sys
 import os
 import signal
+import functools
 
+try:
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst, GLib
+except (ImportError, ValueError):
+    print("Error: GStreamer not found. Please install GStreamer first.")
+    print("Run: ./install-gst.sh")
+    sys.exit(1)
 
+# Initialize GStreamer
+Gst.init(None)
+
+
+@functools.lru_cache(maxsize=None)
 def check_gstreamer_plugin(plugin_name):
-    """Check if a GStreamer plugin is available."""
-    try:
-        result = subprocess.run(
-            ['gst-inspect-1.0', plugin_name],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False
-        )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    """Check if a GStreamer plugin is available using Gst Registry (cached per process)."""
+    registry = Gst.Registry.get()
+    return registry.find_plugin(plugin_name) is not None or \
+           registry.find_feature(plugin_name, Gst.ElementFactory.__gtype__) is not None
 
 
-def build_gstreamer_pipeline(video_file, server_ip, server_port, topic='/stream/go2/front', protocol='udp', loop=False):
-    """Build GStreamer pipeline for streaming video file to MediaMTX."""
-    
-    # Check for hardware encoders (Jetson/Tegra)
-    use_hw_encoder = False
-    encoder = None
-    video_convert = None
-    
+# Pipeline templates, filled in with a single str.format() call
+# filesrc reads the file, decodebin handles the container/codec (MP4, AVI, MKV, etc.)
+_SOURCE_TPL = 'filesrc location="{video_file}" ! decodebin'
+
+# Conversion + encoder per selected encoder, with low-latency options
+_ENCODE_TPL = {
+    # Jetson: nvvidconv converts to NVMM format
+    'nvv4l2h264enc': '! nvvidconv ! video/x-raw(memory:NVMM),format=NV12 ! nvv4l2h264enc iframeinterval=1',
+    # NVIDIA GPU encoder
+    'nv264enc': '! nvvidconv ! video/x-raw(memory:NVMM),format=NV12 ! nv264enc',
+    # VAAPI: vaapipostproc handles format conversion, encoder tuned for low latency
+    'vaapih264enc': '! vaapipostproc ! video/x-raw,format=NV12 ! vaapih264enc tune=low-latency keyframe-period=1',
+    # V4L2 hardware encoder: convert to a format the encoder can handle
+    'v4l2h264enc': '! videoconvert ! video/x-raw,format=I420 ! v4l2h264enc keyframe-interval=1',
+    # x264enc software encoder - low-latency settings (default medium preset +
+    # sync-lookahead=40 adds over a second of latency)
+    'x264enc': '! videoconvert ! video/x-raw,format=I420 '
+               '! x264enc speed-preset=ultrafast tune=zerolatency key-int-max=30 sync-lookahead=0 '
+               f'sliced-threads=true threads={os.cpu_count() or 2} bitrate=2000',
+}
+
+# H.264 parsing + sink
+# RTMP: FLV muxer and RTMP sink
+_RTMP_SINK_TPL = ('! h264parse ! flvmux streamable=true '
+                  '! rtmpsink location=rtmp://{server_ip}:{server_port}{topic} sync=true')
+# UDP RTP (default) - optimized for lowest latency
+# A 2 MiB SO_SNDBUF lets the kernel absorb keyframe bursts; the kernel clamps it
+# to net.core.wmem_max (212 KiB on stock Jetson kernels), see --raise-wmem-max
+_UDP_SINK_TPL = ('! h264parse ! rtph264pay config-interval=1 pt=96 mtu=1400 '
+                 '! udpsink host={server_ip} port={server_port} sync=false '
+                 'buffer-size=2097152 auto-multicast=false')
+
+UDP_WMEM_MAX = 4194304
+
+
+@functools.lru_cache(maxsize=1)
+def _select_encoder():
+    """Pick the best available H.264 encoder once per process."""
     if check_gstreamer_plugin('nvv4l2h264enc'):
         # Jetson hardware encoder
-        use_hw_encoder = True
-        encoder = 'nvv4l2h264enc'
-        video_convert = 'nvvidconv'
         print("Using Jetson hardware encoder (nvv4l2h264enc)")
-    elif check_gstreamer_plugin('nv264enc'):
+        return 'nvv4l2h264enc'
+    if check_gstreamer_plugin('nv264enc'):
         # NVIDIA desktop GPU encoder
-        use_hw_encoder = True
-        encoder = 'nv264enc'
-        video_convert = 'nvvidconv'
         print("Using NVIDIA GPU encoder (nv264enc)")
-    elif check_gstreamer_plugin('vaapih264enc'):
+        return 'nv264enc'
+    if check_gstreamer_plugin('vaapih264enc'):
         # Intel/AMD VAAPI encoder
-        use_hw_encoder = True
-        encoder = 'vaapih264enc'
-        video_convert = 'vaapipostproc'
         print("Using VAAPI hardware encoder (vaapih264enc)")
-    elif check_gstreamer_plugin('v4l2h264enc'):
+        return 'vaapih264enc'
+    if check_gstreamer_plugin('v4l2h264enc'):
         # V4L2 hardware encoder
-        use_hw_encoder = True
-        encoder = 'v4l2h264enc'
-        video_convert = 'videoconvert'
         print("Using V4L2 hardware encoder (v4l2h264enc)")
-    else:
-        # Software encoder fallback
-        encoder = 'x264enc'
-        video_convert = 'videoconvert'
-        print("Using software encoder (x264enc)")
+        return 'v4l2h264enc'
+    # Software encoder fallback
+    print("Using software encoder (x264enc)")
+    return 'x264enc'
+
+
+def build_gstreamer_pipeline(video_file, server_ip, server_port, topic='/stream/go2/front', protocol='udp', loop=False):
+    """Build GStreamer pipeline for streaming video file to MediaMTX."""
     
-    # Build pipeline components
-    # Start with filesrc to read the video file
-    pipeline_parts = [
-        f'filesrc location={video_file}'
-    ]
+    # Encoder selection is probed once and cached
+    encoder = _select_encoder()
     
     # Note: filesrc doesn't support loop property
     # Looping is handled at the application level
+    sink = _RTMP_SINK_TPL if protocol.lower() == 'rtmp' else _UDP_SINK_TPL
     
-    # Use decodebin to automatically decode the video file
-    # This handles various video formats (MP4, AVI, MKV, etc.)
-    pipeline_parts.append('! decodebin')
-    
-    # Add video conversion based on encoder type
-    if video_convert == 'nvvidconv':
-        # For Jetson: nvvidconv converts to NVMM format
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw(memory:NVMM),format=NV12')
-    elif video_convert == 'vaapipostproc':
-        # For VAAPI: vaapipostproc handles format conversion
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw,format=NV12')
-    elif video_convert == 'videoconvert':
-        # For software/V4L2 encoder: convert to a format the encoder can handle
-        pipeline_parts.append('! videoconvert')
-        pipeline_parts.append('! video/x-raw,format=I420')
-    else:
-        # Fallback: let format negotiate automatically
-        pipeline_parts.append('! videoconvert')
-        pipeline_parts.append('! video/x-raw')
-    
-    # Add encoder with low-latency optimizations
-    if encoder == 'nvv4l2h264enc':
-        # Jetson hardware encoder
-        pipeline_parts.append(f'! {encoder} iframeinterval=1')
-    elif encoder == 'nv264enc':
-        # NVIDIA GPU encoder
-        pipeline_parts.append(f'! {encoder}')
-    elif encoder == 'vaapih264enc':
-        # VAAPI encoder - low latency tuning
-        pipeline_parts.append(f'! {encoder} tune=low-latency keyframe-period=1')
-    elif encoder == 'v4l2h264enc':
-        # V4L2 hardware encoder
-        pipeline_parts.append(f'! {encoder} keyframe-interval=1')
-    else:
-        # x264enc software encoder - low-latency settings
-        # pipeline_parts.append(f'! {encoder} speed-preset=ultrafast tune=zerolatency key-int-max=1 sync-lookahead=0 sliced-threads=true threads=1')
-        pipeline_parts.append(f'! {encoder} ')
-    
-    # Add H.264 parsing
-    pipeline_parts.append('! h264parse')
-    
-    if protocol.lower() == 'rtmp':
-        # RTMP streaming: use FLV muxer and RTMP sink
-        rtmp_url = f'rtmp://{server_ip}:{server_port}{topic}'
-        pipeline_parts.extend([
-            '! flvmux streamable=true',
-            f'! rtmpsink location={rtmp_url} sync=true'
-        ])
-    else:
-        # UDP RTP streaming (default) - optimized for lowest latency
-        pipeline_parts.extend([
-            '! rtph264pay config-interval=1 pt=96 mtu=1400',
-            f'! udpsink host={server_ip} port={server_port} sync=false buffer-size=1'
-        ])
-    
-    pipeline = ' '.join(pipeline_parts)
-    return pipeline
+    return f"{_SOURCE_TPL} {_ENCODE_TPL[encoder]} {sink}".format(
+        video_file=video_file, server_ip=server_ip, server_port=server_port, topic=topic
+    )
+
+
+def raise_wmem_max(value=UDP_WMEM_MAX):
+    """Raise net.core.wmem_max so udpsink's buffer-size isn't clamped (requires root)."""
+    path = '/proc/sys/net/core/wmem_max'
+    try:
+        with open(path) as f:
+            current = int(f.read().strip())
+        if current >= value:
+            return
+        with open(path, 'w') as f:
+            f.write(str(value))
+        print(f"Raised net.core.wmem_max from {current} to {value}")
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not raise net.core.wmem_max: {e}")
+
+
+def run_pipeline(pipeline_str):
+    """Run the pipeline in-process until EOS or error.
+
+    Returns True if the stream reached EOS, False on error.
+    """
+    try:
+        pipeline = Gst.parse_launch(pipeline_str)
+    except GLib.Error as e:
+        print(f"\nFailed to create pipeline: {e}")
+        return False
+
+    loop = GLib.MainLoop()
+    reached_eos = False
+
+    def on_message(bus, message):
+        nonlocal reached_eos
+        t = message.type
+        if t == Gst.MessageType.EOS:
+            reached_eos = True
+            loop.quit()
+        elif t == Gst.MessageType.ERROR:
+            err, debug = message.parse_error()
+            print(f"\nPipeline Error: {err.message}")
+            if debug:
+                print(f"Debug Info: {debug}")
+            loop.quit()
+        return True
+
+    bus = pipeline.get_bus()
+    bus.add_signal_watch()
+    bus.connect("message", on_message)
+
+    pipeline.set_state(Gst.State.PLAYING)
+    try:
+        loop.run()
+    finally:
+        bus.remove_signal_watch()
+        pipeline.set_state(Gst.State.NULL)
+    return reached_eos
 
 
 def main():
@@ -183,6 +211,12 @@ Examples:
         help='Loop the video file when it reaches the end'
     )
     
+    parser.add_argument(
+        '--raise-wmem-max',
+        action='store_true',
+        help=f'Raise net.core.wmem_max to {UDP_WMEM_MAX} so the UDP send buffer is not clamped (requires root)'
+    )
+    
     args = parser.parse_args()
     
     # Check if video file exists
@@ -190,15 +224,6 @@ Examples:
         print(f"Error: Video file {args.video_file} not found")
         sys.exit(1)
     
-    # Check if GStreamer is available
-    try:
-        subprocess.run(['gst-inspect-1.0', '--version'], 
-                      capture_output=True, check=True)
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        print("Error: GStreamer not found. Please install GStreamer first.")
-        print("Run: ./install-gst.sh")
-        sys.exit(1)
-    
     # Adjust port based on protocol if user specified wrong default
     if args.protocol == 'rtmp' and args.port == 8000:
         # RTMP default port is 1935
@@ -207,6 +232,12 @@ Examples:
         # UDP default port is 8000
         args.port = 8000
     
+    if args.raise_wmem_max and args.protocol == 'udp':
+        if os.geteuid() == 0:
+            raise_wmem_max()
+        else:
+            print("Warning: --raise-wmem-max requires root, skipping")
+    
     # Build and print pipeline
     pipeline = build_gstreamer_pipeline(
         args.video_file,
@@ -239,46 +270,23 @@ Examples:
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Run GStreamer pipeline
-    cmd = ['gst-launch-1.0'] + pipeline.split()
-    print(f"Running: gst-launch-1.0 {pipeline}\n")
-    
-    if args.loop:
-        # Loop forever by restarting the pipeline when it ends
+    # Run GStreamer pipeline in-process (no gst-launch-1.0 fork per restart)
+    try:
         iteration = 0
         while True:
-            try:
-                iteration += 1
-                if iteration > 1:
-                    print(f"\nRestarting stream (iteration {iteration})...\n")
-                result = subprocess.run(cmd, check=False)
-                # If pipeline ended successfully (EOS), restart it
-                if result.returncode == 0:
-                    print("\nVideo ended, restarting...")
-                    continue
-                else:
-                    # Pipeline ended with error, exit
-                    print(f"\nError running GStreamer pipeline: {result}")
-                    sys.exit(1)
-            except KeyboardInterrupt:
-                print("\nStopping stream...")
-                sys.exit(0)
-            except Exception as e:
-                print(f"\nUnexpected error: {e}")
+            iteration += 1
+            if iteration > 1:
+                print(f"\nRestarting stream (iteration {iteration})...\n")
+            if not run_pipeline(pipeline):
+                # Pipeline ended with error, exit
                 sys.exit(1)
-    else:
-        # Run once
-        try:
-            subprocess.run(cmd, check=True)
-        except KeyboardInterrupt:
-            print("\nStopping stream...")
-            sys.exit(0)
-        except subprocess.CalledProcessError as e:
-            print(f"\nError running GStreamer pipeline: {e}")
-            sys.exit(1)
-        except Exception as e:
-            print(f"\nUnexpected error: {e}")
-            sys.exit(1)
+            if not args.loop:
+                break
+            # Pipeline ended successfully (EOS), restart it
+            print("\nVideo ended, restarting...")
+    except KeyboardInterrupt:
+        print("\nStopping stream...")
+        sys.exit(0)
 
 
 if __name__ == '__main__':
@@ -3,86 +3,342 @@
 Video Publisher - Stream video from V4L2 device to MediaMTX server via UDP
 """
 
-import argparse
 import subprocess
 import sys
 import os
 import signal
+import shutil
+import stat
 import time
+import re
+import json
+import fcntl
+import ctypes
+import errno
+import struct
+import threading
+import functools
+import itertools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# GStreamer bindings are imported lazily by init_gstreamer(): loading them
+# scans the plugin registry, which --help and --list-devices never need
+Gst = None
+GLib = None
+
+# Child processes are spawned with close_fds=False: Python creates its fds
+# (including subprocess pipes) non-inheritable, so nothing leaks across exec
+# and the child-side fd close walk is skipped
+
+# Resolved once - PATH is walked a single time, not per gst-inspect-1.0 call
+GST_INSPECT = shutil.which('gst-inspect-1.0')
+
+# Bus poll interval (ns) - short enough that Ctrl+C is handled promptly
+BUS_POLL_INTERVAL = 100 * 1000 * 1000
+# How long to wait (ns) for EOS to flush through the pipeline on shutdown
+EOS_TIMEOUT = 3 * 1000 * 1000 * 1000
+
+# On-disk cache of format listings - a camera's formats don't change across runs
+FORMAT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'stream', 'v4l2-formats.json'
+)
+
+# v4l2-ctl --list-formats-ext lines, e.g. "[0]: 'YUYV' (YUYV 4:2:2)" and
+# "Size: Discrete 640x480" / "Size: Stepwise 16x16 - 1920x1080"
+V4L2_FORMAT_RE = re.compile(r"\[\d+\]:\s*'([^']+)'")
+V4L2_LINE_RE = re.compile(
+    r"\s*(?:\[\d+\]:\s*'(?P<fmt>[^']+)'"
+    r"|Size:\s*(?:Discrete|Stepwise)\s+(?P<size>\d+x\d+(?:\s*-\s*\d+x\d+)?))"
+)
+
+# VIDIOC_QUERYCAP = _IOR('V', 0, struct v4l2_capability), sizeof == 104
+VIDIOC_QUERYCAP = 0x80685600
+V4L2_CAPABILITY_SIZE = 104
+V4L2_CAP_DRIVER = slice(0, 16)  # __u8 driver[16]
+V4L2_CAP_CARD = slice(16, 48)  # __u8 card[32]
+V4L2_CAP_BUS_INFO = slice(48, 80)  # __u8 bus_info[32]
+
+# VIDIOC_ENUM_FMT = _IOWR('V', 2, struct v4l2_fmtdesc)
+# VIDIOC_ENUM_FRAMESIZES = _IOWR('V', 74, struct v4l2_frmsizeenum)
+VIDIOC_ENUM_FMT = 0xC0405602
+VIDIOC_ENUM_FRAMESIZES = 0xC02C564A
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE = 9
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+
+
+class v4l2_fmtdesc(ctypes.Structure):
+    _fields_ = [
+        ('index', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('flags', ctypes.c_uint32),
+        ('description', ctypes.c_char * 32),
+        ('pixelformat', ctypes.c_uint32),
+        ('mbus_code', ctypes.c_uint32),
+        ('reserved', ctypes.c_uint32 * 3),
+    ]
+
+
+class v4l2_frmsize_discrete(ctypes.Structure):
+    _fields_ = [
+        ('width', ctypes.c_uint32),
+        ('height', ctypes.c_uint32),
+    ]
+
+
+class v4l2_frmsize_stepwise(ctypes.Structure):
+    _fields_ = [
+        ('min_width', ctypes.c_uint32),
+        ('max_width', ctypes.c_uint32),
+        ('step_width', ctypes.c_uint32),
+        ('min_height', ctypes.c_uint32),
+        ('max_height', ctypes.c_uint32),
+        ('step_height', ctypes.c_uint32),
+    ]
+
+
+class _v4l2_frmsize_union(ctypes.Union):
+    _fields_ = [
+        ('discrete', v4l2_frmsize_discrete),
+        ('stepwise', v4l2_frmsize_stepwise),
+    ]
+
+
+class v4l2_frmsizeenum(ctypes.Structure):
+    _anonymous_ = ('u',)
+    _fields_ = [
+        ('index', ctypes.c_uint32),
+        ('pixel_format', ctypes.c_uint32),
+        ('type', ctypes.c_uint32),
+        ('u', _v4l2_frmsize_union),
+        ('reserved', ctypes.c_uint32 * 2),
+    ]
+
+
+_format_cache = None
+_format_cache_dirty = False
+_format_cache_lock = threading.Lock()
+
+
+def _cap_string(cap, field):
+    return bytes(cap[field]).split(b'\0', 1)[0].decode(errors='replace')
+
+
+def get_device_identity(device):
+    """Return 'driver|card|bus_info' for the device via VIDIOC_QUERYCAP, '' on error."""
+    try:
+        fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return ''
+    try:
+        cap = bytearray(V4L2_CAPABILITY_SIZE)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, cap)
+        return '|'.join(_cap_string(cap, field)
+                        for field in (V4L2_CAP_DRIVER, V4L2_CAP_CARD, V4L2_CAP_BUS_INFO))
+    except OSError:
+        return ''
+    finally:
+        os.close(fd)
+
+
+def device_cache_key(device):
+    """Cache key for a device: path, device number, driver, card name and bus position.
+
+    A different camera in the same USB port keeps the same /dev/videoN, st_rdev
+    and bus_info; the driver and card name are what tell the models apart.
+    """
+    try:
+        rdev = os.stat(device).st_rdev
+    except OSError:
+        return None
+    return f"{device}|{rdev}|{get_device_identity(device)}"
+
+
+def _load_format_cache():
+    global _format_cache
+    if _format_cache is None:
+        try:
+            with open(FORMAT_CACHE_PATH) as f:
+                _format_cache = json.load(f)
+        except (OSError, ValueError):
+            _format_cache = {}
+    return _format_cache
+
+
+def save_format_cache():
+    """Write the format cache back to disk if it changed (atomic replace)."""
+    global _format_cache_dirty
+    with _format_cache_lock:
+        if not _format_cache_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(FORMAT_CACHE_PATH), exist_ok=True)
+            tmp_path = f"{FORMAT_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(_format_cache, f)
+            os.replace(tmp_path, FORMAT_CACHE_PATH)
+            _format_cache_dirty = False
+        except OSError:
+            pass
 
 
 def get_device_formats(device):
+    """Get supported formats for a video device, using the on-disk cache when possible.
+
+    Returns a dict of format -> up to 5 sizes, in the order the device reports them.
+    """
+    global _format_cache_dirty
+    key = device_cache_key(device)
+    if key is None:
+        return {}
+    
+    with _format_cache_lock:
+        entry = _load_format_cache().get(key)
+    if entry:
+        return entry['formats']
+    
+    formats = query_device_formats(device)
+    # Don't cache failures - the device may just be busy right now. An empty
+    # result (e.g. a UVC metadata node) is a real answer and is cached
+    if formats is None:
+        return {}
+    with _format_cache_lock:
+        _format_cache[key] = {'formats': formats, 'mtime': time.time()}
+        _format_cache_dirty = True
+    return formats
+
+
+def _enum_frame_sizes(fd, pixelformat):
+    """Enumerate frame sizes for one pixel format with VIDIOC_ENUM_FRAMESIZES."""
+    sizes = []
+    frmsize = v4l2_frmsizeenum(pixel_format=pixelformat)
+    while True:
+        try:
+            fcntl.ioctl(fd, VIDIOC_ENUM_FRAMESIZES, frmsize)
+        except OSError:
+            break
+        if frmsize.type == V4L2_FRMSIZE_TYPE_DISCRETE:
+            sizes.append(f"{frmsize.discrete.width}x{frmsize.discrete.height}")
+        else:
+            # Continuous/stepwise ranges are reported once, as min - max
+            sw = frmsize.stepwise
+            sizes.append(f"{sw.min_width}x{sw.min_height} - {sw.max_width}x{sw.max_height}")
+            break
+        frmsize.index += 1
+    return sizes
+
+
+def enum_device_formats(device):
+    """Enumerate formats and frame sizes directly with V4L2 ioctls.
+
+    Returns a dict of fourcc -> set of sizes (empty if the device has no
+    capture formats, e.g. a UVC metadata node), or None if the device can't
+    be queried this way (caller falls back to v4l2-ctl).
+    """
+    try:
+        fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return None
+    
+    sizes_by_format = defaultdict(set)
+    try:
+        for buf_type in (V4L2_BUF_TYPE_VIDEO_CAPTURE, V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE):
+            fmtdesc = v4l2_fmtdesc(type=buf_type)
+            while True:
+                try:
+                    fcntl.ioctl(fd, VIDIOC_ENUM_FMT, fmtdesc)
+                except OSError as e:
+                    if e.errno != errno.EINVAL:
+                        return None
+                    break  # EINVAL: no more formats for this buffer type
+                fourcc = struct.pack('<I', fmtdesc.pixelformat).decode('ascii', errors='replace').rstrip()
+                sizes_by_format[fourcc].update(_enum_frame_sizes(fd, fmtdesc.pixelformat))
+                fmtdesc.index += 1
+            if sizes_by_format:
+                break
+    finally:
+        os.close(fd)
+    
+    return sizes_by_format
+
+
+def query_device_formats(device):
+    """Get supported formats for a video device.
+
+    Uses V4L2 ioctls directly and only falls back to spawning v4l2-ctl when
+    the ioctl enumeration fails. Returns None if neither could query the device.
+    """
+    sizes_by_format = enum_device_formats(device)
+    if sizes_by_format is None:
+        return query_device_formats_v4l2ctl(device) or None
+    
+    # Show up to 5 sizes per format
+    return {fmt: sorted(size_set)[:5] for fmt, size_set in sizes_by_format.items()}
+
+
+def query_device_formats_v4l2ctl(device):
     """Get supported formats for a video device using v4l2-ctl."""
-    formats = []
-    sizes_by_format = {}
+    formats = {}
+    sizes_by_format = defaultdict(set)
     
     try:
-        # Try detailed format listing first
-        result = subprocess.run(
+        # Try detailed format listing first. Parse lines as v4l2-ctl writes them
+        # instead of buffering and splitting all of stdout. A timer enforces the
+        # 3s timeout (signal.setitimer only works on the main thread, and this
+        # runs in list_video_devices' worker threads)
+        proc = subprocess.Popen(
             ['v4l2-ctl', '--device', device, '--list-formats-ext'],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            check=False,
-            timeout=3
+            close_fds=False
         )
-        
-        if result.returncode == 0 and result.stdout:
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(3, kill_on_timeout)
+        timer.start()
+        try:
             current_format = None
-            sizes = []
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line.startswith('[') and ':' in line:
-                    # Format line like: [0]: 'YUYV' (YUYV 4:2:2)
-                    # Save previous format's sizes before starting new format
-                    if current_format and sizes:
-                        if current_format not in sizes_by_format:
-                            sizes_by_format[current_format] = []
-                        sizes_by_format[current_format].extend(sizes)
-                    
-                    if "'" in line:
-                        current_format = line.split("'")[1]
-                        sizes = []
-                elif line.startswith('Size:') and current_format:
-                    # Size line like: Size: Discrete 640x480
-                    size_info = line.replace('Size: Discrete ', '').replace('Size: Stepwise ', '').strip()
-                    if size_info and 'x' in size_info:
-                        sizes.append(size_info)
-                elif line.startswith('Interval:') and current_format and sizes:
-                    # Interval line - store sizes for current format
-                    if current_format not in sizes_by_format:
-                        sizes_by_format[current_format] = []
-                    sizes_by_format[current_format].extend(sizes)
-                    sizes = []
-            
-            # Save last format's sizes if any
-            if current_format and sizes:
-                if current_format not in sizes_by_format:
-                    sizes_by_format[current_format] = []
-                sizes_by_format[current_format].extend(sizes)
-            
-            # Add formats with their sizes
-            for fmt, size_list in sizes_by_format.items():
-                unique_sizes = sorted(set(size_list))[:5]  # Show up to 5 sizes
-                if unique_sizes:
-                    formats.append(f"{fmt} ({', '.join(unique_sizes)})")
-                else:
-                    formats.append(fmt)
+            for line in proc.stdout:
+                m = V4L2_LINE_RE.match(line)
+                if m is None:
+                    continue
+                if m.lastgroup == 'fmt':
+                    current_format = m.group('fmt')
+                elif current_format:
+                    sizes_by_format[current_format].add(m.group('size'))
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        
+        # Non-zero exit (or killed on timeout): treat as no detailed listing
+        if proc.returncode == 0:
+            # Add formats with their sizes (up to 5 each)
+            formats = {fmt: sorted(size_set)[:5] for fmt, size_set in sizes_by_format.items()}
         
-        # If no detailed formats, try simple format listing
-        if not formats:
+        # If no detailed formats, try simple format listing - unless the device
+        # already hung for the full timeout, where a second call would too
+        if not formats and not timed_out.is_set():
             result2 = subprocess.run(
                 ['v4l2-ctl', '--device', device, '--list-formats'],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
                 check=False,
-                timeout=3
+                timeout=3,
+                close_fds=False
             )
             if result2.returncode == 0 and result2.stdout:
-                for line in result2.stdout.split('\n'):
-                    if "'" in line:
-                        fmt = line.split("'")[1]
-                        if fmt not in formats:
-                            formats.append(fmt)
+                formats = dict.fromkeys(V4L2_FORMAT_RE.findall(result2.stdout), [])
     except subprocess.TimeoutExpired:
         pass
     except Exception:
@@ -91,41 +347,47 @@ def get_device_formats(device):
     return formats
 
 
+def _is_char_device(entry):
+    """True if the /dev entry is a character device; False if it vanished (hot-unplug)."""
+    try:
+        return stat.S_ISCHR(entry.stat(follow_symlinks=False).st_mode)
+    except OSError:
+        return False
+
+
 def list_video_devices():
     """List available video devices with their supported output formats."""
     print("\nAvailable video devices and supported formats:")
     
-    devices_found = []
+    # List only /dev/videoN character devices (the name filter runs first, so
+    # only video nodes are stat'ed; a stray /dev/video* file is skipped)
+    with os.scandir('/dev') as it:
+        device_paths = sorted(
+            (e.path for e in it
+             if e.name.startswith('video') and e.name[5:].isdigit()
+             and _is_char_device(e)),
+            key=lambda path: int(path[len('/dev/video'):])
+        )
     
-    # List only /dev/video* devices
-    for dev in sorted([f for f in os.listdir('/dev') if f.startswith('video')]):
-        dev_path = f"/dev/{dev}"
-        if os.path.exists(dev_path):
-            devices_found.append({'name': dev_path, 'path': dev_path})
+    # Query supported formats for all devices concurrently - each v4l2-ctl call
+    # is I/O bound and keeps its own 3s timeout, so the total stays ~3s worst case
+    results = []
+    if device_paths:
+        with ThreadPoolExecutor(max_workers=min(8, len(device_paths))) as ex:
+            results = list(ex.map(get_device_formats, device_paths))
+        save_format_cache()
     
     # Collect all device data for table display
     table_data = []
-    for device_info in devices_found:
-        device_path = device_info.get('path') or device_info.get('name', '')
-        
-        # Get supported formats
-        formats = get_device_formats(device_path)
+    for device_path, formats in zip(device_paths, results):
         if formats:
-            # Show unique formats (remove duplicates)
-            unique_formats = []
-            seen = set()
-            for fmt in formats:
-                # Extract just the format name for deduplication
-                fmt_name = fmt.split(' (')[0] if ' (' in fmt else fmt
-                if fmt_name not in seen:
-                    seen.add(fmt_name)
-                    unique_formats.append(fmt)
-            
-            # Format formats string (limit to first 5 for table)
-            if len(unique_formats) > 5:
-                formats_str = ', '.join(unique_formats[:5]) + f" (+{len(unique_formats) - 5} more)"
-            else:
-                formats_str = ', '.join(unique_formats)
+            # Formats are already unique and in device order (limit to first 5 for table)
+            formats_str = ', '.join(
+                f"{fmt} ({', '.join(sizes)})" if sizes else fmt
+                for fmt, sizes in itertools.islice(formats.items(), 5)
+            )
+            if len(formats) > 5:
+                formats_str += f" (+{len(formats) - 5} more)"
         else:
             formats_str = "(could not query - device may be in use)"
         
@@ -140,8 +402,8 @@ def list_video_devices():
         return
     
     # Calculate column widths
-    max_device_len = max(len(d['device']) for d in table_data) if table_data else 0
-    max_formats_len = max(len(d['formats']) for d in table_data) if table_data else 0
+    max_device_len = max(len(d['device']) for d in table_data)
+    max_formats_len = max(len(d['formats']) for d in table_data)
     
     # Set minimum column widths
     device_width = max(20, max_device_len + 2)
@@ -151,29 +413,50 @@ def list_video_devices():
     print(f"\n{'Device':<{device_width}} {'Supported Formats':<{formats_width}}")
     print("=" * (device_width + formats_width))
     
-    # Print table rows
+    # Print table rows (slicing already leaves shorter strings untouched)
+    dw = device_width - 2
+    fw = formats_width - 2
     for device in table_data:
-        dev = device['device'][:device_width-2] if len(device['device']) > device_width-2 else device['device']
-        formats = device['formats'][:formats_width-2] if len(device['formats']) > formats_width-2 else device['formats']
+        dev = device['device'][:dw]
+        formats = device['formats'][:fw]
         print(f"{dev:<{device_width}} {formats:<{formats_width}}")
 
 
-def check_gstreamer_plugin(plugin_name):
-    """Check if a GStreamer plugin is available."""
+@functools.lru_cache(maxsize=1)
+def available_gst_elements():
+    """Names of all installed GStreamer plugins and elements (one gst-inspect-1.0 run).
+
+    gst-inspect-1.0 with no arguments lists every feature as
+    "plugin:  element: description", so a single registry load covers all
+    encoder checks instead of one gst-inspect-1.0 per candidate.
+    """
+    if GST_INSPECT is None:
+        return frozenset()
     try:
         result = subprocess.run(
-            ['gst-inspect-1.0', plugin_name],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False
+            [GST_INSPECT],
+            capture_output=True,
+            text=True,
+            check=False,
+            close_fds=False
         )
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    except OSError:
+        return frozenset()
+    
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split(':', 2)
+        if len(parts) == 3:
+            names.add(parts[0].strip())
+            names.add(parts[1].strip())
+    return frozenset(names)
 
 
 def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY', resolution='1920x1080', topic='/stream/go2/front', protocol='udp'):
-    """Build GStreamer pipeline for UDP or RTMP streaming to MediaMTX."""
+    """Build GStreamer pipeline for UDP or RTMP streaming to MediaMTX.
+
+    Returns the pipeline as a list of gst-launch style tokens.
+    """
     
     # Parse resolution
     try:
@@ -188,26 +471,27 @@ def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY'
     use_hw_encoder = False
     encoder = None
     video_convert = None
+    elements = available_gst_elements()
     
-    if check_gstreamer_plugin('nvv4l2h264enc'):
+    if 'nvv4l2h264enc' in elements:
         # Jetson hardware encoder
         use_hw_encoder = True
         encoder = 'nvv4l2h264enc'
         video_convert = 'nvvidconv'
         print("Using Jetson hardware encoder (nvv4l2h264enc)")
-    elif check_gstreamer_plugin('nv264enc'):
+    elif 'nv264enc' in elements:
         # NVIDIA desktop GPU encoder
         use_hw_encoder = True
         encoder = 'nv264enc'
         video_convert = 'nvvidconv'
         print("Using NVIDIA GPU encoder (nv264enc)")
-    elif check_gstreamer_plugin('vaapih264enc'):
+    elif 'vaapih264enc' in elements:
         # Intel/AMD VAAPI encoder
         use_hw_encoder = True
         encoder = 'vaapih264enc'
         video_convert = 'vaapipostproc'
         print("Using VAAPI hardware encoder (vaapih264enc)")
-    elif check_gstreamer_plugin('v4l2h264enc'):
+    elif 'v4l2h264enc' in elements:
         # V4L2 hardware encoder
         use_hw_encoder = True
         encoder = 'v4l2h264enc'
@@ -222,9 +506,11 @@ def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY'
     # Build pipeline components
     # Start with v4l2src - optimized for low latency
     # io-mode=2 (DMA) for zero-copy when possible, do-timestamp=true for accurate timing
+    # Parts are kept as separate argv-style tokens so values containing spaces
+    # (e.g. a device path) are never split
     pipeline_parts = [
-        f'v4l2src device={device} io-mode=2 do-timestamp=true',
-        '! video/x-raw'
+        'v4l2src', f'device={device}', 'io-mode=2', 'do-timestamp=true',
+        '!', 'video/x-raw'
     ]
     
     # Add video conversion based on encoder type - only convert if absolutely necessary
@@ -233,45 +519,46 @@ def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY'
         # For Jetson: nvvidconv can accept I420, NV12, YUY2, UYVY directly
         # It converts to NVMM format internally - no pre-conversion needed
         # This avoids an extra videoconvert step, reducing latency
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw(memory:NVMM),format=NV12')
+        pipeline_parts.extend(['!', video_convert])
+        pipeline_parts.extend(['!', 'video/x-raw(memory:NVMM),format=NV12'])
     elif video_convert == 'vaapipostproc':
         # For VAAPI: vaapipostproc handles format conversion internally
         # Let it negotiate from native format
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw,format=NV12')
+        pipeline_parts.extend(['!', video_convert])
+        pipeline_parts.extend(['!', 'video/x-raw,format=NV12'])
     elif video_convert == 'videoconvert':
         # For software/V4L2 encoder: let encoder negotiate format directly
         # Most encoders can handle common formats (I420, NV12, YUY2, UYVY)
         # Only convert if encoder absolutely requires a specific format
         # For now, let it pass through and let encoder negotiate
-        pipeline_parts.append('! video/x-raw')
+        pipeline_parts.extend(['!', 'video/x-raw'])
     else:
         # Fallback: let format negotiate automatically
-        pipeline_parts.append('! video/x-raw')
+        pipeline_parts.extend(['!', 'video/x-raw'])
     
     # Add encoder with low-latency optimizations
     if encoder == 'nvv4l2h264enc':
         # Jetson hardware encoder - optimize for lowest latency
         # Use only valid properties: bitrate, iframeinterval (for I-frame frequency)
-        pipeline_parts.append(f'! {encoder} bitrate=2000000 iframeinterval=1')
+        pipeline_parts.extend(['!', encoder, 'bitrate=2000000', 'iframeinterval=1'])
     elif encoder == 'nv264enc':
         # NVIDIA GPU encoder - use valid properties only
-        pipeline_parts.append(f'! {encoder} bitrate=2000000')
+        pipeline_parts.extend(['!', encoder, 'bitrate=2000000'])
     elif encoder == 'vaapih264enc':
         # VAAPI encoder - low latency tuning
-        pipeline_parts.append(f'! {encoder} bitrate=2000000 tune=low-latency keyframe-period=1')
+        pipeline_parts.extend(['!', encoder, 'bitrate=2000000', 'tune=low-latency', 'keyframe-period=1'])
     elif encoder == 'v4l2h264enc':
         # V4L2 hardware encoder - minimal settings for low latency
-        pipeline_parts.append(f'! {encoder} keyframe-interval=1')
+        pipeline_parts.extend(['!', encoder, 'keyframe-interval=1'])
     else:
         # x264enc software encoder - maximum low-latency settings
-        pipeline_parts.append(f'! {encoder} bitrate=2000 speed-preset=ultrafast tune=zerolatency keyint=1 sync-lookahead=0 sliced-threads=true threads=1')
+        pipeline_parts.extend(['!', encoder, 'bitrate=2000', 'speed-preset=ultrafast', 'tune=zerolatency',
+                               'keyint=1', 'sync-lookahead=0', 'sliced-threads=true', 'threads=1'])
     
     # Add H.264 parsing - minimal processing for low latency
     # Note: Some encoders output proper NAL units and h264parse can be skipped
     # But rtph264pay typically needs it - keeping it minimal
-    pipeline_parts.append('! h264parse')
+    pipeline_parts.extend(['!', 'h264parse'])
     
     if protocol.lower() == 'rtmp':
         # RTMP streaming: use FLV muxer and RTMP sink
@@ -279,23 +566,77 @@ def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY'
         # Optimize for low latency
         rtmp_url = f'rtmp://{server_ip}:{server_port}{topic}'
         pipeline_parts.extend([
-            '! flvmux streamable=true',
-            f'! rtmpsink location={rtmp_url} sync=false'
+            '!', 'flvmux', 'streamable=true',
+            '!', 'rtmpsink', f'location={rtmp_url}', 'sync=false'
         ])
     else:
         # UDP RTP streaming (default) - optimized for lowest latency
         # Topic is used for MediaMTX server configuration - ensure MediaMTX is configured
         # to accept UDP RTP streams on this topic/path from the source IP/port
         pipeline_parts.extend([
-            '! rtph264pay config-interval=1 pt=96 mtu=1400',  # Smaller MTU for lower latency
-            f'! udpsink host={server_ip} port={server_port} sync=false buffer-size=1'  # sync=false and minimal buffer
+            '!', 'rtph264pay', 'config-interval=1', 'pt=96', 'mtu=1400',  # Smaller MTU for lower latency
+            '!', 'udpsink', f'host={server_ip}', f'port={server_port}', 'sync=false', 'buffer-size=1'  # sync=false and minimal buffer
         ])
     
-    pipeline = ' '.join(pipeline_parts)
-    return pipeline
+    return pipeline_parts
+
+
+def init_gstreamer():
+    """Import and initialize the GStreamer Python bindings (once, on first use)."""
+    global Gst, GLib
+    if Gst is not None:
+        return
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst as _Gst, GLib as _GLib
+    _Gst.init(None)
+    Gst, GLib = _Gst, _GLib
+
+
+def run_pipeline(pipeline_parts):
+    """Run the pipeline (list of tokens) in-process until EOS or error.
+
+    On KeyboardInterrupt an EOS event is sent so the muxer/sink can flush
+    before the pipeline is torn down, then the interrupt is re-raised.
+    """
+    try:
+        # parse_launchv takes the tokens as-is, like gst-launch-1.0's argv
+        pipeline = Gst.parse_launchv(pipeline_parts)
+    except GLib.Error as e:
+        print(f"\nFailed to create pipeline: {e}")
+        return
+    
+    bus = pipeline.get_bus()
+    pipeline.set_state(Gst.State.PLAYING)
+    try:
+        while True:
+            msg = bus.timed_pop_filtered(BUS_POLL_INTERVAL, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+            if msg is None:
+                continue
+            if msg.type == Gst.MessageType.ERROR:
+                err, debug = msg.parse_error()
+                print(f"\nError running GStreamer pipeline: {err.message}")
+                if debug:
+                    print(f"Debug Info: {debug}")
+            else:
+                print("\nEnd-of-stream")
+            break
+    except KeyboardInterrupt:
+        pipeline.send_event(Gst.Event.new_eos())
+        bus.timed_pop_filtered(EOS_TIMEOUT, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+        raise
+    finally:
+        pipeline.set_state(Gst.State.NULL)
 
 
 def main():
+    # Fast path: listing devices needs no other options, so skip importing and
+    # building the argparse parser entirely
+    if any(arg in ('-l', '--list-devices') for arg in sys.argv[1:]):
+        list_video_devices()
+        sys.exit(0)
+    
+    import argparse
     parser = argparse.ArgumentParser(
         description='Stream video from V4L2 device to MediaMTX server via UDP or RTMP',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -374,11 +715,9 @@ Examples:
         print("\nUse -l or --list-devices to see available devices")
         sys.exit(1)
     
-    # Check if GStreamer is available
-    try:
-        subprocess.run(['gst-inspect-1.0', '--version'], 
-                      capture_output=True, check=True)
-    except (FileNotFoundError, subprocess.CalledProcessError):
+    # Check if GStreamer is available (PATH lookup only - running
+    # gst-inspect-1.0 --version would load the whole plugin registry)
+    if GST_INSPECT is None:
         print("Error: GStreamer not found. Please install GStreamer first.")
         print("Run: ./install-gst.sh")
         sys.exit(1)
@@ -392,7 +731,7 @@ Examples:
         args.port = 8000
     
     # Build and print pipeline
-    pipeline = build_gstreamer_pipeline(
+    pipeline_parts = build_gstreamer_pipeline(
         args.device, 
         args.server, 
         args.port,
@@ -413,35 +752,44 @@ Examples:
     else:
         print(f"\nNote: Ensure MediaMTX server is configured to accept UDP RTP stream on topic '{args.topic}'")
         print(f"      from source {args.server}:{args.port}")
-    print(f"\nPipeline: {pipeline}\n")
+    print(f"\nPipeline: {' '.join(pipeline_parts)}\n")
     
-    # Handle Ctrl+C gracefully
+    try:
+        init_gstreamer()
+    except (ImportError, ValueError):
+        # No Python GStreamer bindings: replace this process with gst-launch-1.0.
+        # The tokens are passed as argv verbatim; -e makes Ctrl+C send EOS so the
+        # stream is flushed, and signals go straight to gst-launch (no restart loop)
+        print("GStreamer Python bindings not available, running gst-launch-1.0\n")
+        try:
+            # exec replaces the process without flushing: a piped/redirected
+            # stdout is block-buffered and the lines above would be lost
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execvp('gst-launch-1.0', ['gst-launch-1.0', '-e'] + pipeline_parts)
+        except OSError as e:
+            print(f"Error: could not run gst-launch-1.0: {e}")
+            sys.exit(1)
+    
+    # Handle Ctrl+C / SIGTERM gracefully: run_pipeline sends EOS on KeyboardInterrupt
     def signal_handler(sig, frame):
-        print("\nStopping stream...")
-        sys.exit(0)
+        raise KeyboardInterrupt
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    restart_count = 0   
+    # Run GStreamer pipeline in-process (no gst-launch-1.0 fork per restart)
+    restart_count = 0
     while True:
-        # Run GStreamer pipeline
         try:
-            # gst-launch-1.0 expects the pipeline as a single string
-            cmd = ['gst-launch-1.0'] + pipeline.split()
-            print(f"Running: gst-launch-1.0 {pipeline}\n")
-            subprocess.run(cmd, check=True)
+            run_pipeline(pipeline_parts)
         except KeyboardInterrupt:
             print("\nStopping stream...")
-        except subprocess.CalledProcessError as e:
-            print(f"\nError running GStreamer pipeline: {e}")
-        except Exception as e:
-            print(f"\nUnexpected error: {e}")
+            break
         restart_count += 1
         print(f"Restarting stream... (attempt {restart_count})")
         time.sleep(1)
 
-
 if __name__ == '__main__':
     main()
 
@@ -8,7 +8,12 @@ import subprocess
 import sys
 import os
 import signal
+import stat
+import re
 import time
+import random
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import gi
 
 gi.require_version('Gst', '1.0')
@@ -18,18 +23,26 @@ from gi.repository import Gst, GLib
 Gst.init(None)
 
 # Constants
-RECONNECT_DELAY = 2
+RECONNECT_DELAY = 1          # Base reconnect delay (s), doubled per failed attempt
+RECONNECT_MAX_DELAY = 30     # Cap for the reconnect delay (s)
+RECONNECT_JITTER = 0.5       # Up to +50% random jitter on each delay
+STABLE_STREAM_TIME = 60      # Stream PLAYING this long (s) resets the backoff
 STALL_THRESHOLD = 5
+STATUS_BITRATE_DELTA = 0.05  # Mbps change needed to redraw the status line
 DEFAULT_RTMP_TIMEOUT = 2
 
+# v4l2-ctl --list-formats-ext parsing, e.g. "[0]: 'YUYV' (YUYV 4:2:2)" / "Size: Discrete 640x480"
+FORMAT_RE = re.compile(r"\[\d+\]:\s*'([^']+)'")
+SIZE_RE = re.compile(r"Size:\s*(?:Discrete|Stepwise)\s+(\d+x\d+)")
+FORMAT_OR_SIZE_RE = re.compile(f"{FORMAT_RE.pattern}|{SIZE_RE.pattern}")
+
 
 def get_device_formats(device):
-    """Get supported formats for a video device using v4l2-ctl."""
+    """Get supported formats for a video device using a single v4l2-ctl call."""
     formats = []
     sizes_by_format = {}
     
     try:
-        # Try detailed format listing first
         result = subprocess.run(
             ['v4l2-ctl', '--device', device, '--list-formats-ext'],
             capture_output=True,
@@ -39,75 +52,55 @@ def get_device_formats(device):
         )
         
         if result.returncode == 0 and result.stdout:
+            # One pass over the whole buffer: sizes belong to the most recent format
             current_format = None
-            sizes = []
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line.startswith('[') and ':' in line:
-                    if current_format and sizes:
-                        if current_format not in sizes_by_format:
-                            sizes_by_format[current_format] = []
-                        sizes_by_format[current_format].extend(sizes)
-                    
-                    if "'" in line:
-                        current_format = line.split("'")[1]
-                        sizes = []
-                elif line.startswith('Size:') and current_format:
-                    size_info = line.replace('Size: Discrete ', '').replace('Size: Stepwise ', '').strip()
-                    if size_info and 'x' in size_info:
-                        sizes.append(size_info)
-                elif line.startswith('Interval:') and current_format and sizes:
-                    if current_format not in sizes_by_format:
-                        sizes_by_format[current_format] = []
-                    sizes_by_format[current_format].extend(sizes)
-                    sizes = []
-            
-            if current_format and sizes:
-                if current_format not in sizes_by_format:
-                    sizes_by_format[current_format] = []
-                sizes_by_format[current_format].extend(sizes)
+            for m in FORMAT_OR_SIZE_RE.finditer(result.stdout):
+                fmt, size = m.groups()
+                if fmt:
+                    current_format = fmt
+                    sizes_by_format.setdefault(fmt, set())
+                elif current_format:
+                    sizes_by_format[current_format].add(size)
             
-            for fmt, size_list in sizes_by_format.items():
-                unique_sizes = sorted(set(size_list))[:5]
+            for fmt, size_set in sizes_by_format.items():
+                unique_sizes = sorted(size_set)[:5]
                 if unique_sizes:
                     formats.append(f"{fmt} ({', '.join(unique_sizes)})")
                 else:
                     formats.append(fmt)
-        
-        if not formats:
-            result2 = subprocess.run(
-                ['v4l2-ctl', '--device', device, '--list-formats'],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=3
-            )
-            if result2.returncode == 0 and result2.stdout:
-                for line in result2.stdout.split('\n'):
-                    if "'" in line:
-                        fmt = line.split("'")[1]
-                        if fmt not in formats:
-                            formats.append(fmt)
     except Exception:
         pass
     
     return formats
 
 
+def _is_char_device(entry):
+    """True if the /dev entry is a character device; False if it vanished (hot-unplug)."""
+    try:
+        return stat.S_ISCHR(entry.stat(follow_symlinks=False).st_mode)
+    except OSError:
+        return False
+
+
 def list_video_devices():
     """List available video devices with their supported output formats."""
     print("\nAvailable video devices and supported formats:")
     
-    devices_found = []
-    for dev in sorted([f for f in os.listdir('/dev') if f.startswith('video')]):
-        dev_path = f"/dev/{dev}"
-        if os.path.exists(dev_path):
-            devices_found.append({'name': dev_path, 'path': dev_path})
+    # Filter on the name first so only /dev/video* entries are stat'ed, and
+    # skip anything that isn't a character device (e.g. a stray regular file)
+    with os.scandir('/dev') as it:
+        device_paths = sorted(e.path for e in it
+                              if e.name.startswith('video') and _is_char_device(e))
+    
+    # Query all devices concurrently - each v4l2-ctl call is independent and I/O bound
+    formats_map = {}
+    if device_paths:
+        with ThreadPoolExecutor(max_workers=min(8, len(device_paths))) as ex:
+            formats_map = dict(zip(device_paths, ex.map(get_device_formats, device_paths)))
     
     table_data = []
-    for device_info in devices_found:
-        device_path = device_info.get('path') or device_info.get('name', '')
-        formats = get_device_formats(device_path)
+    for device_path in device_paths:
+        formats = formats_map[device_path]
         if formats:
             unique_formats = []
             seen = set()
@@ -146,92 +139,88 @@ def list_video_devices():
         print(f"{dev:<{device_width}} {formats:<{formats_width}}")
 
 
+@functools.lru_cache(maxsize=None)
 def check_gstreamer_plugin(plugin_name):
-    """Check if a GStreamer plugin is available using Gst Registry."""
+    """Check if a GStreamer plugin is available using Gst Registry (cached per process)."""
     registry = Gst.Registry.get()
     return registry.find_plugin(plugin_name) is not None or \
            registry.find_feature(plugin_name, Gst.ElementFactory.__gtype__) is not None
 
 
-def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY', resolution='1920x1080', topic='/stream/go2/front', protocol='rtmp', rtmp_timeout=DEFAULT_RTMP_TIMEOUT):
-    """Build GStreamer pipeline for UDP or RTMP streaming to MediaMTX."""
-    
-    # Check for hardware encoders
-    encoder = None
-    video_convert = None
-    
+# Pipeline templates, filled in with a single str.format() call
+_SOURCE_TPL = 'v4l2src device={device} io-mode=2 do-timestamp=true'
+
+# Conversion + encoder per selected encoder. Only the nvvidconv/vaapipostproc
+# branches need a video/x-raw caps filter in front; videoconvert negotiates
+# directly with v4l2src
+_ENCODE_TPL = {
+    # Jetson hardware encoder - optimize for lowest latency
+    # Added insert-sps-pps and insert-vui for better client playability
+    'nvv4l2h264enc': '! video/x-raw ! nvvidconv ! video/x-raw(memory:NVMM),format=NV12 '
+                     '! nvv4l2h264enc bitrate=2000000 iframeinterval=30 insert-sps-pps=true insert-vui=true',
+    # NVIDIA GPU encoder
+    'nv264enc': '! video/x-raw ! nvvidconv ! video/x-raw(memory:NVMM),format=NV12 '
+                '! nv264enc bitrate=2000000 insert-sps-pps=true',
+    # VAAPI encoder
+    'vaapih264enc': '! video/x-raw ! vaapipostproc ! video/x-raw,format=NV12 '
+                    '! vaapih264enc bitrate=2000000 tune=low-latency keyframe-period=30',
+    # V4L2 hardware encoder
+    'v4l2h264enc': '! videoconvert ! v4l2h264enc keyframe-interval=30',
+    # x264enc software encoder
+    'x264enc': '! videoconvert ! x264enc bitrate=2000 speed-preset=ultrafast tune=zerolatency '
+               'keyint=30 sync-lookahead=0 sliced-threads=true threads=1',
+}
+
+# H.264 parsing (config interval for better client discovery) + sink
+# RTMP: rtmp2sink for better reliability and built-in timeout support
+_RTMP_SINK_TPL = ('! h264parse config-interval=1 ! flvmux streamable=true '
+                  '! rtmp2sink name=mysink location="rtmp://{server_ip}:{server_port}{path}" '
+                  'sync=false timeout={rtmp_timeout}')
+_UDP_SINK_TPL = ('! h264parse config-interval=1 ! rtph264pay config-interval=1 pt=96 mtu=1400 '
+                 '! udpsink name=mysink host={server_ip} port={server_port} sync=false buffer-size=1048576')
+
+
+@functools.lru_cache(maxsize=1)
+def _select_encoder():
+    """Pick the best available H.264 encoder once per process."""
     if check_gstreamer_plugin('nvv4l2h264enc'):
-        encoder = 'nvv4l2h264enc'
-        video_convert = 'nvvidconv'
         print("Using Jetson hardware encoder (nvv4l2h264enc)")
-    elif check_gstreamer_plugin('nv264enc'):
-        encoder = 'nv264enc'
-        video_convert = 'nvvidconv'
+        return 'nvv4l2h264enc'
+    if check_gstreamer_plugin('nv264enc'):
         print("Using NVIDIA GPU encoder (nv264enc)")
-    elif check_gstreamer_plugin('vaapih264enc'):
-        encoder = 'vaapih264enc'
-        video_convert = 'vaapipostproc'
+        return 'nv264enc'
+    if check_gstreamer_plugin('vaapih264enc'):
         print("Using VAAPI hardware encoder (vaapih264enc)")
-    elif check_gstreamer_plugin('v4l2h264enc'):
-        encoder = 'v4l2h264enc'
-        video_convert = 'videoconvert'
+        return 'vaapih264enc'
+    if check_gstreamer_plugin('v4l2h264enc'):
         print("Using V4L2 hardware encoder (v4l2h264enc)")
-    else:
-        encoder = 'x264enc'
-        video_convert = 'videoconvert'
-        print("Using software encoder (x264enc)")
-    
-    pipeline_parts = [
-        f'v4l2src device={device} io-mode=2 do-timestamp=true',
-        '! video/x-raw'
-    ]
-    
-    if video_convert == 'nvvidconv':
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw(memory:NVMM),format=NV12')
-    elif video_convert == 'vaapipostproc':
-        pipeline_parts.append(f'! {video_convert}')
-        pipeline_parts.append('! video/x-raw,format=NV12')
-    else:
-        pipeline_parts.append('! videoconvert')
-    
-    if encoder == 'nvv4l2h264enc':
-        # Jetson hardware encoder - optimize for lowest latency
-        # Added insert-sps-pps and insert-vui for better client playability
-        pipeline_parts.append(f'! {encoder} bitrate=2000000 iframeinterval=30 insert-sps-pps=true insert-vui=true')
-    elif encoder == 'nv264enc':
-        # NVIDIA GPU encoder
-        pipeline_parts.append(f'! {encoder} bitrate=2000000 insert-sps-pps=true')
-    elif encoder == 'vaapih264enc':
-        # VAAPI encoder
-        pipeline_parts.append(f'! {encoder} bitrate=2000000 tune=low-latency keyframe-period=30')
-    elif encoder == 'v4l2h264enc':
-        # V4L2 hardware encoder
-        pipeline_parts.append(f'! {encoder} keyframe-interval=30')
-    else:
-        # x264enc software encoder
-        pipeline_parts.append(f'! {encoder} bitrate=2000 speed-preset=ultrafast tune=zerolatency keyint=30 sync-lookahead=0 sliced-threads=true threads=1')
+        return 'v4l2h264enc'
+    print("Using software encoder (x264enc)")
+    return 'x264enc'
+
+
+def build_gstreamer_pipeline(device, server_ip, server_port, video_format='UYVY', resolution='1920x1080', topic='/stream/go2/front', protocol='rtmp', rtmp_timeout=DEFAULT_RTMP_TIMEOUT):
+    """Build GStreamer pipeline for UDP or RTMP streaming to MediaMTX."""
     
-    # Add H.264 parsing - send config interval for better client discovery
-    pipeline_parts.append('! h264parse config-interval=1')
+    encoder = _select_encoder()
     
     if protocol.lower() == 'rtmp':
-        # RTMP streaming: Use rtmp2sink (preferred) with timeout
         path = topic if topic.startswith('/') else f'/{topic}'
-        rtmp_url = f'rtmp://{server_ip}:{server_port}{path}'
-        # Using rtmp2sink for better reliability and built-in timeout support
-        pipeline_parts.extend([
-            '! flvmux streamable=true',
-            f'! rtmp2sink name=mysink location="{rtmp_url}" sync=false timeout={rtmp_timeout}'
-        ])
+        sink = _RTMP_SINK_TPL
     else:
-        # UDP RTP streaming (default)
-        pipeline_parts.extend([
-            '! rtph264pay config-interval=1 pt=96 mtu=1400',
-            f'! udpsink name=mysink host={server_ip} port={server_port} sync=false buffer-size=1048576'
-        ])
+        path = topic
+        sink = _UDP_SINK_TPL
     
-    return ' '.join(pipeline_parts)
+    return f"{_SOURCE_TPL} {_ENCODE_TPL[encoder]} {sink}".format(
+        device=device, server_ip=server_ip, server_port=server_port,
+        path=path, rtmp_timeout=rtmp_timeout
+    )
+
+
+def compute_backoff(attempt):
+    """Reconnect delay for the given attempt: capped exponential backoff with jitter."""
+    delay = min(RECONNECT_MAX_DELAY, RECONNECT_DELAY * (2 ** min(attempt, 5)))
+    return delay * (1 + random.random() * RECONNECT_JITTER)
 
 
 class Streamer:
@@ -240,8 +229,13 @@ class Streamer:
         self.pipeline = None
         self.sink = None
         self.last_bytes = 0
+        self._bytes_counter = 0
         self.last_time = time.time()
+        self.last_stream_start = None
         self.stall_counter = 0
+        self._last_state = None
+        self._last_stall_counter = 0
+        self._last_bitrate = 0.0
         self.loop = GLib.MainLoop()
     
     def on_message(self, bus, message):
@@ -259,38 +253,29 @@ class Streamer:
             if message.src == self.pipeline:
                 old_state, new_state, pending_state = message.parse_state_changed()
                 # print(f"Pipeline state changed from {old_state.value_name} to {new_state.value_name}")
+                if new_state == Gst.State.PLAYING and self.last_stream_start is None:
+                    self.last_stream_start = time.time()
         return True
 
-    def get_sink_bytes(self):
-        if not self.sink:
-            return 0
-        
-        # Check if it's udpsink or rtmp2sink
-        try:
-            if hasattr(self.sink.props, 'bytes_served'):
-                return self.sink.get_property('bytes-served')
-            elif self.sink.get_factory().get_name() == 'rtmp2sink':
-                stats = self.sink.get_property('stats')
-                if stats and stats.has_field('out-bytes-total'):
-                    return stats.get_uint64('out-bytes-total')[1]
-        except Exception:
-            pass
-        return 0
+    def _byte_probe(self, pad, info):
+        """Count bytes entering the sink (runs on the streaming thread)."""
+        buf = info.get_buffer()
+        if buf:
+            self._bytes_counter += buf.get_size()
+        return Gst.PadProbeReturn.OK
 
     def status_timer_callback(self):
         if self.pipeline:
             _, state, _ = self.pipeline.get_state(0)
             state_name = Gst.Element.state_get_name(state)
             
-            current_bytes = self.get_sink_bytes()
+            current_bytes = self._bytes_counter
             current_time = time.time()
             
             duration = current_time - self.last_time
             if duration > 0:
                 bitrate = (current_bytes - self.last_bytes) * 8 / (1024 * 1024) / duration  # Mbps
                 
-                status_msg = f"[{time.strftime('%H:%M:%S')}] Status: {state_name} | Bitrate: {bitrate:.2f} Mbps"
-                
                 # Simple stall detection: if we are playing but bitrate is 0 for a while
                 if state == Gst.State.PLAYING and bitrate < 0.01:
                     self.stall_counter += 1
@@ -298,12 +283,21 @@ class Streamer:
                         print(f"\nStream stalled ({STALL_THRESHOLD}s no data). Forcing restart...")
                         self.loop.quit()
                         return False 
-                    status_msg += f" [STALLED {self.stall_counter}/{STALL_THRESHOLD}]"
                 else:
                     self.stall_counter = 0
                 
-                # Use \x1b[K to clear to the end of the line
-                print(f"\r{status_msg}\x1b[K", end='', flush=True)
+                # Only redraw the status line when something visible changed
+                if (state != self._last_state or self.stall_counter != self._last_stall_counter
+                        or abs(bitrate - self._last_bitrate) > STATUS_BITRATE_DELTA):
+                    # No clock in the line: it would freeze on a steady stream
+                    status_msg = "Status: %s | Bitrate: %.2f Mbps" % (state_name, bitrate)
+                    if self.stall_counter:
+                        status_msg += f" [STALLED {self.stall_counter}/{STALL_THRESHOLD}]"
+                    # Use \x1b[K to clear to the end of the line
+                    print(f"\r{status_msg}\x1b[K", end='', flush=True)
+                    self._last_state = state
+                    self._last_stall_counter = self.stall_counter
+                    self._last_bitrate = bitrate
                 
                 self.last_bytes = current_bytes
                 self.last_time = current_time
@@ -317,6 +311,12 @@ class Streamer:
             print(f"Failed to create pipeline: {e}")
             return False
 
+        # Count bytes with a pad probe instead of querying sink-specific stats
+        self._bytes_counter = 0
+        sink_pad = self.sink.get_static_pad('sink') if self.sink else None
+        if sink_pad:
+            sink_pad.add_probe(Gst.PadProbeType.BUFFER, self._byte_probe)
+
         bus = self.pipeline.get_bus()
         bus.add_signal_watch()
         bus.connect("message", self.on_message)
@@ -326,7 +326,9 @@ class Streamer:
         
         self.last_bytes = 0
         self.last_time = time.time()
+        self.last_stream_start = None
         self.stall_counter = 0
+        self._last_state = None
         
         # Add a timer to print status every second
         GLib.timeout_add_seconds(1, self.status_timer_callback)
@@ -340,6 +342,11 @@ class Streamer:
             self.pipeline.set_state(Gst.State.NULL)
         return True # Signal to retry
 
+    def was_stable(self):
+        """True if the last run stayed in PLAYING for at least STABLE_STREAM_TIME."""
+        return self.last_stream_start is not None and \
+               time.time() - self.last_stream_start >= STABLE_STREAM_TIME
+
     def stop(self):
         self.pipeline.set_state(Gst.State.NULL)
 
@@ -380,15 +387,22 @@ def main():
     streamer = Streamer(pipeline_str)
     
     retry_count = 0
+    attempt = 0
     while True:
         should_retry = streamer.run()
         if not should_retry:
             print("\nStopped by user.")
             break
         
+        # A long healthy run means the next failure is a fresh outage
+        if streamer.was_stable():
+            attempt = 0
+        
         retry_count += 1
-        print(f"\nRestarting stream in {RECONNECT_DELAY}s... (attempt {retry_count})")
-        time.sleep(RECONNECT_DELAY)
+        delay = compute_backoff(attempt)
+        attempt += 1
+        print(f"\nRestarting stream in {delay:.1f}s... (attempt {retry_count})")
+        time.sleep(delay)
 
 if __name__ == '__main__':
     main()
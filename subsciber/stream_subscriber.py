@@ -5,16 +5,19 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 import time
-from PyQt5.uic import loadUi
 import threading
+from PyQt5.uic import loadUi
+import functools
 from enum import Enum
+from dataclasses import dataclass
 import os
 import yaml
 import shutil
 from pathlib import Path
-from datetime import datetime
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import atexit
 
 import sys
 from PyQt5.QtCore import Qt
@@ -22,7 +25,10 @@ from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QOp
 import gi
 gi.require_version('Gst', '1.0')
 gi.require_version('GstVideo', '1.0')
-from gi.repository import Gst, GObject, GstVideo
+from gi.repository import Gst, GObject, GstVideo, GLib
+
+# Initialize GStreamer once per process, not per Video widget
+Gst.init(None)
 
 # InfluxDB client
 try:
@@ -37,6 +43,8 @@ except ImportError:
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "stream_subscriber.yaml")
 DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "stream_subscriber.default.yaml")
 LOG_FILE = os.path.join(os.path.dirname(__file__), "stream_subscriber.log")
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), "recordings")
+RECORDING_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
 
 # Single source of default settings (used when config file missing or invalid)
 DEFAULT_SETTINGS = {
@@ -47,6 +55,9 @@ DEFAULT_SETTINGS = {
     "window_width": None,
     "window_height": None,
     "rtsp_transport": "tcp",
+    "rtsp_latency_ms": 50,
+    "recording_queue_max_mb": 256,
+    "recording_segment_seconds": 60,
     "influxdb_url": "http://localhost:8086",
     "influxdb_org": "fcclab",
     "influxdb_bucket": "fcclab",
@@ -55,8 +66,22 @@ DEFAULT_SETTINGS = {
 }
 
 # Configure logging
+_log_listener = None
+
+def _stop_log_listener():
+    """Flush queued log records on exit."""
+    if _log_listener is not None:
+        _log_listener.stop()
+
+atexit.register(_stop_log_listener)
+
 def setup_logging(log_file=None, log_level=logging.DEBUG):
-    """Setup logging configuration with file and console handlers."""
+    """Setup logging configuration with file and console handlers.
+
+    Records are handed to the handlers by a QueueListener thread, so callers
+    (including GStreamer streaming threads running probes and callbacks) only
+    enqueue them and never block on file or console I/O.
+    """
     if log_file is None:
         log_file = LOG_FILE
     
@@ -80,6 +105,9 @@ def setup_logging(log_file=None, log_level=logging.DEBUG):
     
     # Remove existing handlers to avoid duplicates
     root_logger.handlers.clear()
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
     
     # File handler with rotation (10MB max, keep 5 backup files)
     file_handler = RotatingFileHandler(
@@ -90,96 +118,171 @@ def setup_logging(log_file=None, log_level=logging.DEBUG):
     )
     file_handler.setLevel(log_level)
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _log_listener.start()
     
     return root_logger
 
 # Initialize logging
 logger = setup_logging()
 
+@dataclass(frozen=True)
+class StreamURL:
+    """One configured stream: RTSP URL and display name."""
+    __slots__ = ("url", "name")
+    url: str
+    name: str
+
+def parse_urls(url_items):
+    """Build the immutable URL table from the validated "urls" settings list."""
+    return tuple(StreamURL(item["url"], item.get("name", "Unknown")) for item in url_items)
+
 # Global URLs variable - will be initialized from config
-URLs = []
+URLs = ()
 
 FONT_SIZE_PIXELS = 0
+# Primary screen's available geometry, set once the QApplication exists
+SCREEN_GEOM = None
+
+# Record button stylesheets, one per recording state
+_SS_RECORDING = "background-color: red; color: white;"
+_SS_SAVING = "background-color: orange; color: white;"
+_SS_IDLE = ""
 
 # FPS calculation constants
 FPS_DURATION = 0.5  # Calculate FPS every 0.5 seconds
 METRICS_UPDATE_PERIOD = 0.5 # Calculate metrics every 0.5 seconds
 FPS_MOVING_AVERAGE_WINDOW = 10
+RECONNECT_DELAY_MS = 250  # First delay before setting the pipeline back to PLAYING
+RECONNECT_MAX_DELAY_MS = 8000  # Cap for the exponential reconnect back-off
+PLAYING_POLL_INTERVAL_MS = 100  # How often to check whether the pipeline reached PLAYING
+# Render the pipeline graph only when GStreamer's dot dumps were asked for
+_PIPELINE_DUMP_ENABLED = bool(os.environ.get("GST_DEBUG_DUMP_DOT_DIR"))
+RESIZE_LOG_INTERVAL_S = 0.1  # At most one resize debug line per widget per interval during a drag
+
+# Receive pipeline; the tee feeds the display branch and, while recording, a file branch.
+# Decoded frames are uploaded as-is and colour-converted on the GPU (glcolorconvert)
+# instead of by videoconvert on the CPU
+PIPELINE_TEMPLATE = (
+    "rtspsrc name=source ! rtph264depay name=depay ! h264parse name=parser "
+    "! tee name=tee ! {decoder} name=decoder ! glupload name=upload ! glcolorconvert name=convert "
+    "! glimagesink name=sink force-aspect-ratio=true sync=false"
+)
+
+# H.264 decoders in order of preference: VA-API, NVDEC, V4L2 (stateful hardware
+# codecs, e.g. Raspberry Pi), then libav software decoding
+H264_DECODERS = ("vaapih264dec", "nvh264dec", "v4l2h264dec", "avdec_h264")
+
+@functools.lru_cache(maxsize=None)
+def has_element(name):
+    """Whether a GStreamer element factory is installed (registry looked up once per name)."""
+    return Gst.ElementFactory.find(name) is not None
+
+@functools.lru_cache(maxsize=1)
+def select_h264_decoder():
+    """Pick the first available H.264 decoder, probed once per process."""
+    for name in H264_DECODERS:
+        if has_element(name):
+            return name
+    return H264_DECODERS[-1]
+
+@functools.lru_cache(maxsize=1)
+def ensure_recordings_dir():
+    """Create RECORDINGS_DIR on the first recording and return it."""
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    logger.debug("Recordings directory: %s", RECORDINGS_DIR)
+    return RECORDINGS_DIR
+
+def pipeline_description():
+    """Receive pipeline description using the best available decoder."""
+    return PIPELINE_TEMPLATE.format(decoder=select_h264_decoder())
 
 class VideoState(Enum):
     STATE_CLOSE = 0
     STATE_CONNECTING = 1
     STATE_OPEN = 2
 
-class Video(QOpenGLWidget):
+_STATE_LOG = {
+    VideoState.STATE_CLOSE: "CLOSE",
+    VideoState.STATE_OPEN: "OPEN",
+    VideoState.STATE_CONNECTING: "CONNECTING",
+}
+
+# The video is rendered by glimagesink into a native QOpenGLWindow hosted in a
+# window container. A QOpenGLWidget would push the whole top-level window
+# through Qt's FBO compositing path; set STREAM_USE_QOPENGLWIDGET=1 to go back.
+USE_QOPENGLWIDGET = os.environ.get("STREAM_USE_QOPENGLWIDGET", "0") == "1"
+
+class Video(QOpenGLWidget if USE_QOPENGLWIDGET else QWidget):
     
     sig_state_changed = pyqtSignal(VideoState)
     sig_recording_changed = pyqtSignal(str)  # Signal for recording state changes: "recording", "saving", "stopped"
     sig_auto_start_recording = pyqtSignal()  # Signal to auto-start recording after reconnect
     sig_metrics_update = pyqtSignal(float, float) # Signal for metrics update (fps, bitrate)
 
+    _last_resize_log = 0.0
+
     def __change_state(self, state):
         current_state = getattr(self, 'state', None)
-        logger.debug(f"__change_state called: current={current_state}, new={state}")
+        logger.debug("__change_state called: current=%s, new=%s", current_state, state)
         self.state = state
-        if self.state == VideoState.STATE_CLOSE:
-            logger.info("Video state changed to CLOSE")
-        elif self.state == VideoState.STATE_OPEN:
-            logger.info("Video state changed to OPEN")
+        logger.info("Video state changed to %s", _STATE_LOG[state])
+        if state is VideoState.STATE_OPEN:
             # Auto-start recording if it was accepted before disconnect
             if self.auto_record_on_reconnect:
-                logger.info(f"Auto-starting recording after reconnect... (flag={self.auto_record_on_reconnect})")
+                logger.info("Auto-starting recording after reconnect... (flag=%s)", self.auto_record_on_reconnect)
                 # Emit signal to auto-start recording (signals are thread-safe and will be handled in main thread)
                 self.sig_auto_start_recording.emit()
                 logger.debug("Emitted sig_auto_start_recording signal")
             else:
-                logger.debug(f"Not auto-starting: auto_record_on_reconnect={self.auto_record_on_reconnect}")
-        elif self.state == VideoState.STATE_CONNECTING:
-            logger.info("Video state changed to CONNECTING")
+                logger.debug("Not auto-starting: auto_record_on_reconnect=%s", self.auto_record_on_reconnect)
         self.sig_state_changed.emit(self.state)
 
     def __create_pipeline(self):
         logger.debug("Creating GStreamer pipeline")
-        self.pipeline = Gst.Pipeline.new("rtsp-pipeline")
-
-        self.source = Gst.ElementFactory.make("rtspsrc", "source")
-        rtph264depay = Gst.ElementFactory.make("rtph264depay", "depay")
-        h264parse = Gst.ElementFactory.make("h264parse", "parser")
-        
-        # Add tee element to split stream for recording
-        self.tee = Gst.ElementFactory.make("tee", "tee")
-        
-        decoder = Gst.ElementFactory.make("avdec_h264", "decoder")
-        convert = Gst.ElementFactory.make("videoconvert", "convert")
-        sink = Gst.ElementFactory.make("glimagesink", "sink")
-
-        if not all([self.source, rtph264depay, h264parse, self.tee, decoder, convert, sink]):
-            logger.error("Failed to create GStreamer elements")
-            missing = []
-            if not self.source: missing.append("rtspsrc")
-            if not rtph264depay: missing.append("rtph264depay")
-            if not h264parse: missing.append("h264parse")
-            if not self.tee: missing.append("tee")
-            if not decoder: missing.append("avdec_h264")
-            if not convert: missing.append("videoconvert")
-            if not sink: missing.append("glimagesink")
-            logger.error(f"Missing elements: {', '.join(missing)}")
-        else:
-            logger.debug("All GStreamer elements created successfully")
+        # Build the whole chain in one parse_launch() call; the tee splits the
+        # stream for recording. rtspsrc's sometimes-pads are linked to the
+        # depayloader by parse_launch's delayed linking once the RTP pad appears.
+        try:
+            decoder = select_h264_decoder()
+            logger.info("Using H.264 decoder: %s", decoder)
+            self.pipeline = Gst.parse_launch(pipeline_description())
+        except GLib.Error as e:
+            logger.error("Failed to create GStreamer pipeline: %s", e.message)
+            raise
+        self.pipeline.set_name("rtsp-pipeline")
+        logger.debug("All GStreamer elements created successfully")
+
+        self.source = self.pipeline.get_by_name("source")
+        h264parse = self.pipeline.get_by_name("parser")
+        self.tee = self.pipeline.get_by_name("tee")
+        upload = self.pipeline.get_by_name("upload")
+        sink = self.pipeline.get_by_name("sink")
+
+        settings = get_settings()
+
+        # Low-latency jitter buffering: rtspsrc's internal rtpjitterbuffer holds
+        # packets for at most rtsp_latency_ms, late packets are dropped rather than
+        # retransmitted, and timestamps are not slaved to the sender's clock
+        latency_ms = settings.get("rtsp_latency_ms", DEFAULT_SETTINGS["rtsp_latency_ms"])
+        self.source.set_property("latency", latency_ms)
+        self.source.set_property("buffer-mode", 0)  # 0 = none
+        self.source.set_property("drop-on-latency", True)
+        self.source.set_property("do-retransmission", False)
+        self.source.set_property("ntp-sync", False)
+        self.source.set_property("tcp-timeout", 2000000)  # us
+        logger.debug("Set rtspsrc latency to %sms", latency_ms)
 
-        self.source.set_property("latency", 100)  # Adjust latency for real-time streaming
-        logger.debug("Set rtspsrc latency to 100ms")
-        
         # Configure RTSP transport (force TCP by default to avoid UDP timeouts)
         try:
-            settings = load_settings()
             transport = settings.get("rtsp_transport", "tcp")
             if transport == "tcp":
                 self.source.set_property("protocols", 4)  # 4 = GstRTSPLowerTrans.TCP
@@ -188,38 +291,15 @@ class Video(QOpenGLWidget):
                 self.source.set_property("protocols", 1)  # 1 = GstRTSPLowerTrans.UDP
                 logger.info("Forcing RTSP transport to UDP")
             else:
-                logger.debug(f"Using default RTSP transport (protocols={transport})")
+                logger.debug("Using default RTSP transport (protocols=%s)", transport)
         except Exception as e:
-            logger.error(f"Error setting RTSP transport: {e}")
-        # self.source.set_property("tcp-timeout", 2000000)
+            logger.error("Error setting RTSP transport: %s", e)
         # self.source.set_property("timeout", 2000000)
 
-        sink.set_property("force-aspect-ratio", True)
-        sink.set_property("sync", False)
-        sink.set_window_handle(self.winId())
-        logger.debug("Configured glimagesink: force-aspect-ratio=True, sync=False")
-
-        self.pipeline.add(self.source)
-        self.pipeline.add(rtph264depay)
-        self.pipeline.add(h264parse)
-        self.pipeline.add(self.tee)
-        self.pipeline.add(decoder)
-        self.pipeline.add(convert)
-        self.pipeline.add(sink)
-
-        rtph264depay.link(h264parse)
-        h264parse.link(self.tee)
-        
-        # Create request pad for display sink
-        tee_src_pad = self.tee.get_request_pad("src_%u")
-        decoder_sink_pad = decoder.get_static_pad("sink")
-        tee_src_pad.link(decoder_sink_pad)
-        
-        decoder.link(convert)
-        convert.link(sink)
-        
+        sink.set_window_handle(self._video_window.winId())
+
         # Add probe to count frames for FPS calculation
-        sink_pad = convert.get_static_pad("sink")
+        sink_pad = upload.get_static_pad("sink")
         if sink_pad:
             def frame_probe_callback(pad, info):
                 """Callback function to count frames."""
@@ -227,7 +307,7 @@ class Video(QOpenGLWidget):
                 return Gst.PadProbeReturn.OK
             
             sink_pad.add_probe(Gst.PadProbeType.BUFFER, frame_probe_callback)
-            logger.debug("Added frame counting probe to convert element sink pad")
+            logger.debug("Added frame counting probe to glupload sink pad")
         else:
             logger.warning("Could not get sink pad for frame counting probe")
 
@@ -246,10 +326,13 @@ class Video(QOpenGLWidget):
         else:
             logger.warning("Could not get h264parse sink pad for bitrate probe")
         
-        # Recording elements (will be added when recording starts)
+        # Recording elements (built on the first recording, then kept in the
+        # pipeline, unlinked and parked in READY, between recordings)
+        self.recording_bin = None
+        self.recording_bin_config = None
+        self.recording_overruns = 0
         self.recording_queue = None
         self.recording_h264parse = None
-        self.recording_mux = None
         self.recording_sink = None
         self.recording_tee_pad = None  # Store tee pad reference for cleanup
         self.is_recording = False
@@ -258,45 +341,33 @@ class Video(QOpenGLWidget):
         self.auto_record_on_reconnect = False  # Flag to auto-start recording after reconnect
         self.is_stopping_recording = False  # Flag to prevent concurrent stop_recording calls
 
-        def on_pad_added(element, pad):
-            caps = pad.query_caps(None)
-            name = caps.to_string()
-            logger.debug(f"Pad added: {name}")
-            if name.startswith("application/x-rtp"):
-                sink_pad = rtph264depay.get_static_pad("sink")
-                pad.link(sink_pad)
-                logger.debug("Linked RTP pad to rtph264depay")
-        self.source.connect("pad-added", on_pad_added)
-        
         # Log pipeline structure
         logger.info("="*80)
         logger.info("GStreamer Pipeline:")
         logger.info("="*80)
-        logger.info(f"Pipeline: {self.pipeline.get_name()}")
-        elements = []
-        it = self.pipeline.iterate_elements()
-        while True:
-            result, element = it.next()
-            if result == Gst.IteratorResult.DONE:
-                break
-            if result == Gst.IteratorResult.OK:
-                elements.append(element.get_name())
-        logger.info(f"Elements: {' -> '.join(elements)}")
-        logger.info(f"Pipeline description: rtspsrc -> rtph264depay -> h264parse -> avdec_h264 -> videoconvert -> glimagesink")
+        logger.info("Pipeline: rtsp-pipeline")
+        # The topology is static, so the description is all there is to log; the
+        # element graph is only rendered when GST_DEBUG_DUMP_DOT_DIR is set
+        logger.info("Pipeline description: %s", pipeline_description())
         logger.info("="*80)
+        if _PIPELINE_DUMP_ENABLED:
+            logger.debug("Pipeline graph:\n%s", Gst.debug_bin_to_dot_data(self.pipeline, Gst.DebugGraphDetails.ALL))
+            # Writes rtsp-pipeline.dot into GST_DEBUG_DUMP_DOT_DIR
+            Gst.debug_bin_to_dot_file(self.pipeline, Gst.DebugGraphDetails.ALL, "rtsp-pipeline")
         logger.debug("Pipeline creation completed")
 
     def open_stream(self, URL_index, max_tries=None):
-        logger.debug(f"open_stream called: URL_index={URL_index}, max_tries={max_tries}, current_state={self.state}")
+        logger.debug("open_stream called: URL_index=%s, max_tries=%s, current_state=%s", URL_index, max_tries, self.state)
         if self.state == VideoState.STATE_OPEN:
             logger.warning("Video is already open, ignoring open_stream request")
             return
 
-        url = URLs[URL_index]["url"]
-        url_name = URLs[URL_index].get("name", "Unknown")
-        logger.info(f"Opening stream: {url_name} at URL: {url}")
+        entry = URLs[URL_index]
+        url = entry.url
+        url_name = entry.name
+        logger.info("Opening stream: %s at URL: %s", url_name, url)
         self.source.set_property("location", url)
-        logger.debug(f"Set rtspsrc location to: {url}")
+        logger.debug("Set rtspsrc location to: %s", url)
         # Reset bitrate counters for new stream
         self.bytes_received = 0
         self.bitrate_last_bytes = 0
@@ -307,14 +378,15 @@ class Video(QOpenGLWidget):
         self.current_bitrate_mbps = 0.0
         self.current_fps = 0.0
         
-        self.metrics_last_time = time.time()
+        self.metrics_last_time = time.monotonic()
         
         ret = self.pipeline.set_state(Gst.State.PLAYING)
-        logger.debug(f"Pipeline set_state(PLAYING) returned: {ret}")
+        logger.debug("Pipeline set_state(PLAYING) returned: %s", ret)
         self.__change_state(VideoState.STATE_CONNECTING)
+        self._wait_for_playing()
 
     def close_stream(self):
-        logger.debug(f"close_stream called: current_state={self.state}, is_recording={self.is_recording}")
+        logger.debug("close_stream called: current_state=%s, is_recording=%s", self.state, self.is_recording)
         if self.state == VideoState.STATE_CLOSE:
             logger.warning("Video is already closed, ignoring close_stream request")
             return
@@ -325,15 +397,20 @@ class Video(QOpenGLWidget):
                 logger.info("Stopping active recording before closing stream")
                 self.stop_recording()
             self.auto_record_on_reconnect = False  # Clear flag when manually closing
+            self._cancel_reconnect()
+            self._reconnect_delay_ms = RECONNECT_DELAY_MS
             ret = self.pipeline.set_state(Gst.State.NULL)
-            logger.debug(f"Pipeline set_state(NULL) returned: {ret}")
+            logger.debug("Pipeline set_state(NULL) returned: %s", ret)
+            # The parked recording bin's state is locked, so the pipeline's NULL
+            # transition skips it: shut it down explicitly
+            self._discard_recording_bin()
             self.__change_state(VideoState.STATE_CLOSE)
             logger.info("Stream closed successfully")
     
     def _calculate_metrics(self):
         """Calculate metrics and emit signal."""
         # Calculate time delta
-        current_time = time.time()
+        current_time = time.monotonic()
         time_delta = current_time - self.metrics_last_time
         
         if time_delta <= 0:
@@ -367,7 +444,7 @@ class Video(QOpenGLWidget):
         """Start the metrics update timer."""
         if not self._metrics_timer.isActive():
             # Reset counters to avoid stale data spikes
-            self.metrics_last_time = time.time()
+            self.metrics_last_time = time.monotonic()
             self.fps_last_frames = self.total_frames
             self.bitrate_last_bytes = self.bytes_received
             
@@ -401,9 +478,9 @@ class Video(QOpenGLWidget):
     
     def start_recording(self, file_path=None):
         """Start recording the video stream to a file."""
-        logger.debug(f"start_recording called: file_path={file_path}, state={self.state}, is_recording={self.is_recording}")
+        logger.debug("start_recording called: file_path=%s, state=%s, is_recording=%s", file_path, self.state, self.is_recording)
         if self.state != VideoState.STATE_OPEN:
-            logger.warning(f"Cannot start recording: stream is not open (state={self.state})")
+            logger.warning("Cannot start recording: stream is not open (state=%s)", self.state)
             return False
         
         if self.is_recording:
@@ -412,443 +489,272 @@ class Video(QOpenGLWidget):
         
         # Clean up any leftover recording elements from previous recording
         # This ensures we can start a new recording even if the previous one wasn't fully cleaned up
-        if self.recording_tee_pad is not None or self.recording_queue is not None:
+        if self.recording_tee_pad is not None:
             logger.warning("Found leftover recording elements from previous recording, cleaning up...")
-            try:
-                # Force cleanup of any remaining recording elements
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        peer = self.recording_tee_pad.get_peer()
-                        if peer:
-                            self.recording_tee_pad.unlink(peer)
-                        self.recording_tee_pad.set_active(False)
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except Exception as e:
-                        logger.warning(f"Error releasing leftover tee pad: {e}")
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
-                # Reset recording state
-                self.is_recording = False
-                self.recording_file_path = None
-                self.recording_start_time = None
-                logger.info("Cleaned up leftover recording elements")
-            except Exception as e:
-                logger.error(f"Error during cleanup of leftover elements: {e}", exc_info=True)
+            self._reset_recording_branch()
+            logger.info("Cleaned up leftover recording elements")
         
         # Generate file path if not provided
         if file_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            # Create recordings directory if it doesn't exist
-            recordings_dir = os.path.join(os.path.dirname(__file__), "recordings")
-            os.makedirs(recordings_dir, exist_ok=True)
-            logger.debug(f"Recordings directory: {recordings_dir}")
+            timestamp = time.strftime(RECORDING_TIMESTAMP_FORMAT)
+            recordings_dir = ensure_recordings_dir()
             # Try MP4 first, but we'll use MKV if mp4mux fails
             file_path = os.path.join(recordings_dir, f"recording_{timestamp}.mkv")
-            logger.debug(f"Generated recording file path: {file_path}")
+            logger.debug("Generated recording file path: %s", file_path)
         else:
-            logger.debug(f"Using provided recording file path: {file_path}")
+            logger.debug("Using provided recording file path: %s", file_path)
         
         self.recording_file_path = file_path
-        logger.info(f"Starting recording to: {file_path}")
+        logger.info("Starting recording to: %s", file_path)
         
         try:
             logger.debug("Creating recording pipeline elements...")
-            # Create recording elements - record the encoded H.264 stream
-            self.recording_queue = Gst.ElementFactory.make("queue", "recording_queue")
-            # Add another h264parse to ensure proper format for muxer
-            self.recording_h264parse = Gst.ElementFactory.make("h264parse", "recording_h264parse")
-            logger.debug("Created recording_queue and recording_h264parse")
-            
             # Determine output format and muxer
-            # Use mpegtsmux for continuous recording (no segments, better for long recordings)
+            # Use mpegtsmux for continuous recording (a fragment cut short by a crash stays playable)
             # Fallback to matroskamux or mp4mux if mpegtsmux not available
-            use_mp4 = file_path.endswith('.mp4')
-            use_mkv = file_path.endswith('.mkv')
-            
-            # Try mpegtsmux first (best for continuous recording without segments)
-            self.recording_mux = Gst.ElementFactory.make("mpegtsmux", "recording_mux")
-            if self.recording_mux:
-                # mpegtsmux doesn't create segments, perfect for continuous recording
+            if has_element("mpegtsmux"):
+                mux = "mpegtsmux"
                 if not file_path.endswith('.ts') and not file_path.endswith('.mts'):
                     # Change extension to .ts for mpegtsmux
                     file_path = file_path.rsplit('.', 1)[0] + '.ts'
-                    self.recording_file_path = file_path
-                    logger.debug(f"Changed file extension to .ts for mpegtsmux: {file_path}")
-                logger.info("Using mpegtsmux for continuous recording")
+                    logger.debug("Changed file extension to .ts for mpegtsmux: %s", file_path)
+            elif file_path.endswith('.mp4') and has_element("mp4mux"):
+                mux = "mp4mux"
             else:
-                # Fallback to matroskamux or mp4mux
-                if use_mp4:
-                    self.recording_mux = Gst.ElementFactory.make("mp4mux", "recording_mux")
-                    if not self.recording_mux:
-                        logger.warning("mp4mux not available, using matroskamux instead")
-                        self.recording_mux = Gst.ElementFactory.make("matroskamux", "recording_mux")
-                        file_path = file_path.replace('.mp4', '.mkv')
-                        self.recording_file_path = file_path
-                        logger.info("Using matroskamux (fallback from mp4mux)")
-                    else:
-                        logger.info("Using mp4mux")
-                        # Configure mp4mux for continuous recording (not streamable)
-                        try:
-                            self.recording_mux.set_property("streamable", False)
-                            logger.debug("Set mp4mux streamable=False")
-                        except Exception as e:
-                            logger.debug(f"Could not set mp4mux streamable property: {e}")
-                        try:
-                            self.recording_mux.set_property("fragment-duration", 0)
-                            logger.debug("Set mp4mux fragment-duration=0")
-                        except Exception as e:
-                            logger.debug(f"Could not set mp4mux fragment-duration property: {e}")
-                else:
-                    self.recording_mux = Gst.ElementFactory.make("matroskamux", "recording_mux")
-                    logger.info("Using matroskamux")
-                    # Configure matroskamux for continuous recording
-                    try:
-                        self.recording_mux.set_property("streamable", False)
-                        logger.debug("Set matroskamux streamable=False")
-                    except Exception as e:
-                        logger.debug(f"Could not set matroskamux streamable property: {e}")
-                    try:
-                        self.recording_mux.set_property("writing-app", "stream_subscriber")
-                        logger.debug("Set matroskamux writing-app=stream_subscriber")
-                    except Exception as e:
-                        logger.debug(f"Could not set matroskamux writing-app property: {e}")
-            
-            self.recording_sink = Gst.ElementFactory.make("filesink", "recording_sink")
+                if file_path.endswith('.mp4'):
+                    logger.warning("mp4mux not available, using matroskamux instead")
+                    file_path = file_path.replace('.mp4', '.mkv')
+                mux = "matroskamux"
+            logger.info("Using muxer: %s", mux)
             
-            if not all([self.recording_queue, self.recording_h264parse, self.recording_mux, self.recording_sink]):
-                logger.error("Failed to create recording elements")
-                missing = []
-                if not self.recording_queue: missing.append("queue")
-                if not self.recording_h264parse: missing.append("h264parse")
-                if not self.recording_mux: missing.append("muxer")
-                if not self.recording_sink: missing.append("filesink")
-                logger.error(f"Missing elements: {', '.join(missing)}")
+            # splitmuxsink starts a new, separately finalized file at the first
+            # keyframe after every recording_segment_seconds: name_00000.ts,
+            # name_00001.ts, ... A crash loses at most the open fragment.
+            base, ext = os.path.splitext(file_path)
+            location = f"{base}_%05d{ext}"
+            # Updated from the bus as splitmuxsink opens each fragment
+            self.recording_file_path = location % 0
+            segment_ns = int(get_settings().get("recording_segment_seconds", DEFAULT_SETTINGS["recording_segment_seconds"]) * Gst.SECOND)
+            max_bytes = int(get_settings().get("recording_queue_max_mb", DEFAULT_SETTINGS["recording_queue_max_mb"]) * 1024 * 1024)
+            try:
+                self._prepare_recording_bin(mux, max_bytes, segment_ns)
+            except GLib.Error as e:
+                self._abort_recording_setup("create recording bin", e)
                 return False
+            self.recording_overruns = 0
+            # Only the file pattern changes from one recording to the next
+            self.recording_sink.set_property("location", location)
+            logger.debug("Set splitmuxsink location to: %s", location)
             
-            logger.debug("All recording elements created successfully")
-            # Set file path
-            self.recording_sink.set_property("location", file_path)
-            logger.debug(f"Set filesink location to: {file_path}")
-            
-            # Configure queue for better buffering
-            # Use Gst.CLOCK_TIME_NONE (2^64-1) for unlimited time instead of 0
-            self.recording_queue.set_property("max-size-buffers", 200)
-            self.recording_queue.set_property("max-size-time", Gst.CLOCK_TIME_NONE)  # Unlimited time
-            self.recording_queue.set_property("max-size-bytes", 0)  # 0 means unlimited bytes
-            self.recording_queue.set_property("leaky", 0)  # No leaky - don't drop buffers, block instead
-            logger.debug("Configured recording queue: max-size-buffers=200, max-size-time=CLOCK_TIME_NONE, leaky=0")
-            
-            # Add elements to pipeline
-            logger.debug("Adding recording elements to pipeline...")
-            self.pipeline.add(self.recording_queue)
-            self.pipeline.add(self.recording_h264parse)
-            self.pipeline.add(self.recording_mux)
-            self.pipeline.add(self.recording_sink)
-            logger.debug("Recording elements added to pipeline")
-            
-            # Link elements: tee -> queue -> h264parse -> mux -> filesink
-            # Get a new src pad from tee (after h264parse, so we have encoded H.264)
-            logger.debug("Linking recording pipeline elements...")
+            # Start the parked branch. Its state is locked, so it is driven
+            # explicitly rather than synced with the pipeline. The tee pad is
+            # linked last, from a blocking probe, once the branch is already running
+            logger.debug("Starting recording bin...")
+            ret, pipeline_state, pending = self.pipeline.get_state(0)
+            logger.debug("Main pipeline state before starting recording: %s, pending: %s", pipeline_state, pending)
+            if pipeline_state != Gst.State.PLAYING:
+                logger.warning("Main pipeline is not in PLAYING state (%s), this may cause recording to fail", pipeline_state)
+            if self.recording_bin.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+                self._abort_recording_setup("start recording bin")
+                return False
+            logger.debug("Recording bin set to PLAYING")
             
             # Verify tee element is available and in correct state
             if not self.tee:
-                logger.error("Tee element is None, cannot create recording branch")
-                self._cleanup_recording_elements()
+                self._abort_recording_setup("tee (element is None)")
                 return False
             
             try:
                 self.recording_tee_pad = self.tee.get_request_pad("src_%u")
-                if not self.recording_tee_pad:
-                    logger.error("Failed to get request pad from tee")
-                    self._cleanup_recording_elements()
-                    return False
-                logger.debug("Got request pad from tee")
-            except Exception as e:
-                logger.error(f"Exception getting tee pad: {e}", exc_info=True)
-                self._cleanup_recording_elements()
-                return False
-            
-            queue_sink_pad = self.recording_queue.get_static_pad("sink")
-            if not queue_sink_pad:
-                logger.error("Failed to get sink pad from recording queue")
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except:
-                        pass
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
-                return False
-            
-            # Link with proper caps negotiation
-            try:
-                link_result = self.recording_tee_pad.link(queue_sink_pad)
-                if link_result != Gst.PadLinkReturn.OK:
-                    logger.error(f"Failed to link tee pad to recording queue: {link_result}")
-                    # Clean up on failure
-                    if self.recording_tee_pad and self.tee:
-                        try:
-                            peer = self.recording_tee_pad.get_peer()
-                            if peer:
-                                self.recording_tee_pad.unlink(peer)
-                            self.recording_tee_pad.set_active(False)
-                            self.tee.release_request_pad(self.recording_tee_pad)
-                        except Exception as e:
-                            logger.warning(f"Error releasing tee pad after link failure: {e}")
-                        self.recording_tee_pad = None
-                    self._cleanup_recording_elements()
-                    return False
-                logger.info(f"Successfully linked tee pad to recording queue: {link_result}")
-            except Exception as e:
-                logger.error(f"Exception linking tee pad: {e}", exc_info=True)
-                # Clean up on exception
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except:
-                        pass
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
-                return False
-            
-            # Check pad capabilities to verify data flow (non-blocking, don't wait if not ready)
-            try:
-                logger.debug("Checking pad capabilities...")
-                tee_caps = self.recording_tee_pad.get_current_caps()
-                queue_caps = queue_sink_pad.get_current_caps()
-                if tee_caps:
-                    logger.debug(f"Tee pad caps: {tee_caps.to_string()}")
-                else:
-                    logger.debug("Tee pad caps: None (not ready yet)")
-                if queue_caps:
-                    logger.debug(f"Queue sink pad caps: {queue_caps.to_string()}")
-                else:
-                    logger.debug("Queue sink pad caps: None (not ready yet)")
-            except Exception as e:
-                logger.debug(f"Could not get pad caps (non-critical): {e}")
-            
-            # Link elements and check for success
-            logger.debug("Linking recording queue to h264parse...")
-            try:
-                link_result = self.recording_queue.link(self.recording_h264parse)
-                if link_result != True:
-                    logger.error(f"Failed to link recording queue to h264parse: {link_result}")
-                    # Clean up on failure
-                    if self.recording_tee_pad and self.tee:
-                        try:
-                            peer = self.recording_tee_pad.get_peer()
-                            if peer:
-                                self.recording_tee_pad.unlink(peer)
-                            self.recording_tee_pad.set_active(False)
-                            self.tee.release_request_pad(self.recording_tee_pad)
-                        except Exception as e:
-                            logger.warning(f"Error releasing tee pad after link failure: {e}")
-                        self.recording_tee_pad = None
-                    self._cleanup_recording_elements()
-                    return False
-                logger.debug("Linked recording queue to h264parse")
             except Exception as e:
-                logger.error(f"Exception linking queue to h264parse: {e}", exc_info=True)
-                # Clean up on exception
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except:
-                        pass
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
+                self._abort_recording_setup("tee request pad", e)
                 return False
-            
-            logger.debug("Linking recording h264parse to mux...")
-            try:
-                link_result = self.recording_h264parse.link(self.recording_mux)
-                if link_result != True:
-                    logger.error(f"Failed to link recording h264parse to mux: {link_result}")
-                    # Clean up on failure
-                    if self.recording_tee_pad and self.tee:
-                        try:
-                            peer = self.recording_tee_pad.get_peer()
-                            if peer:
-                                self.recording_tee_pad.unlink(peer)
-                            self.recording_tee_pad.set_active(False)
-                            self.tee.release_request_pad(self.recording_tee_pad)
-                        except Exception as e:
-                            logger.warning(f"Error releasing tee pad after link failure: {e}")
-                        self.recording_tee_pad = None
-                    self._cleanup_recording_elements()
-                    return False
-                logger.debug("Linked recording h264parse to mux")
-            except Exception as e:
-                logger.error(f"Exception linking h264parse to mux: {e}", exc_info=True)
-                # Clean up on exception
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except:
-                        pass
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
+            if not self.recording_tee_pad:
+                self._abort_recording_setup("tee request pad")
                 return False
+            logger.debug("Got request pad from tee")
             
-            logger.debug("Linking recording mux to sink...")
-            try:
-                link_result = self.recording_mux.link(self.recording_sink)
-                if link_result != True:
-                    logger.error(f"Failed to link recording mux to sink: {link_result}")
-                    # Clean up on failure
-                    if self.recording_tee_pad and self.tee:
-                        try:
-                            peer = self.recording_tee_pad.get_peer()
-                            if peer:
-                                self.recording_tee_pad.unlink(peer)
-                            self.recording_tee_pad.set_active(False)
-                            self.tee.release_request_pad(self.recording_tee_pad)
-                        except Exception as e:
-                            logger.warning(f"Error releasing tee pad after link failure: {e}")
-                        self.recording_tee_pad = None
-                    self._cleanup_recording_elements()
-                    return False
-                logger.debug("Linked recording mux to sink")
-            except Exception as e:
-                logger.error(f"Exception linking mux to sink: {e}", exc_info=True)
-                # Clean up on exception
-                if self.recording_tee_pad and self.tee:
-                    try:
-                        self.tee.release_request_pad(self.recording_tee_pad)
-                    except:
-                        pass
-                    self.recording_tee_pad = None
-                self._cleanup_recording_elements()
-                return False
-            
-            # Set elements to playing state and wait for completion
-            logger.debug("Setting recording elements to PLAYING state...")
-            
-            # Verify main pipeline is in PLAYING state before starting recording elements
-            ret, pipeline_state, pending = self.pipeline.get_state(Gst.SECOND)
-            logger.debug(f"Main pipeline state before starting recording: {pipeline_state}, pending: {pending}")
-            if pipeline_state != Gst.State.PLAYING:
-                logger.warning(f"Main pipeline is not in PLAYING state ({pipeline_state}), this may cause recording to fail")
-            
-            ret = self.recording_queue.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error("Failed to set recording queue to PLAYING")
-                return False
-            elif ret == Gst.StateChangeReturn.ASYNC:
-                self.recording_queue.get_state(Gst.CLOCK_TIME_NONE)
-            logger.debug("Recording queue set to PLAYING")
-            
-            ret = self.recording_h264parse.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error("Failed to set recording h264parse to PLAYING")
-                return False
-            elif ret == Gst.StateChangeReturn.ASYNC:
-                self.recording_h264parse.get_state(Gst.CLOCK_TIME_NONE)
-            logger.debug("Recording h264parse set to PLAYING")
-            
-            ret = self.recording_mux.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error("Failed to set recording mux to PLAYING")
-                return False
-            elif ret == Gst.StateChangeReturn.ASYNC:
-                self.recording_mux.get_state(Gst.CLOCK_TIME_NONE)
-            logger.debug("Recording mux set to PLAYING")
-            
-            ret = self.recording_sink.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error("Failed to set recording sink to PLAYING")
-                return False
-            elif ret == Gst.StateChangeReturn.ASYNC:
-                logger.debug("Recording sink state change is ASYNC, waiting for completion...")
-                # Use a timeout to avoid infinite blocking
-                timeout = 5.0  # 5 seconds timeout
-                start_time = time.time()
-                while (time.time() - start_time) < timeout:
-                    ret_result, state, pending = self.recording_sink.get_state(Gst.SECOND)  # Check every second
-                    if ret_result != Gst.StateChangeReturn.ASYNC:
-                        logger.debug(f"Recording sink state change completed: {state}")
-                        break
-                    if state == Gst.State.PLAYING:
-                        logger.debug("Recording sink reached PLAYING state")
-                        break
-                    time.sleep(0.1)
-                else:
-                    # Timeout reached
-                    ret_result, state, pending = self.recording_sink.get_state(Gst.CLOCK_TIME_NONE)
-                    logger.warning(f"Timeout waiting for recording sink to reach PLAYING. Current state: {state}, Pending: {pending}")
-            else:
-                logger.debug(f"Recording sink set to PLAYING (sync): {ret}")
-            logger.debug("Recording sink set to PLAYING")
-            
-            logger.info("Recording pipeline elements set to PLAYING state")
+            # Attach the branch from the streaming thread between two buffers
+            self.recording_tee_pad.add_probe(Gst.PadProbeType.BLOCK_DOWNSTREAM, self._on_recording_pad_blocked)
+            logger.debug("Added blocking probe on recording tee pad")
             
+            # sig_recording_changed("recording") is emitted, and recording_start_time
+            # reset, from the probe once the tee pad is linked and data flows into
+            # the branch; nothing here waits for the branch to start
             self.is_recording = True
-            self.recording_start_time = time.time()
-            self.sig_recording_changed.emit("recording")
-            logger.info(f"Recording started successfully: {file_path}")
-            logger.debug(f"Recording queue config: max-size-buffers=200, max-size-time={Gst.CLOCK_TIME_NONE}, leaky=0")
-            if self.recording_mux:
-                muxer_name = self.recording_mux.get_factory().get_name()
-                logger.info(f"Using muxer: {muxer_name}")
-                try:
-                    props = []
-                    for prop_name in ['streamable', 'fragment-duration']:
-                        try:
-                            val = self.recording_mux.get_property(prop_name)
-                            props.append(f"{prop_name}={val}")
-                        except:
-                            pass
-                    if props:
-                        logger.debug(f"Muxer properties: {', '.join(props)}")
-                except Exception as e:
-                    logger.debug(f"Could not read muxer properties: {e}")
-            
-            # Start a monitoring thread to check recording status
-            def monitor_recording():
-                last_size = 0
-                no_data_count = 0
-                while self.is_recording:
-                    elapsed = time.time() - self.recording_start_time if self.recording_start_time else 0
-                    if self.recording_file_path and os.path.exists(self.recording_file_path):
-                        file_size = os.path.getsize(self.recording_file_path)
-                        if file_size == last_size and file_size == 0 and elapsed > 5:
-                            no_data_count += 1
-                            if no_data_count >= 2:  # After 10 seconds with no data
-                                logger.warning(f"⚠️ WARNING: Recording file still 0 bytes after {elapsed:.1f}s! No data flowing to recording pipeline.")
-                                # Check if recording elements are still in PLAYING state
-                                try:
-                                    if self.recording_queue:
-                                        ret, state, pending = self.recording_queue.get_state(Gst.CLOCK_TIME_NONE)
-                                        logger.warning(f"Recording queue state: {state}")
-                                    if self.recording_mux:
-                                        ret, state, pending = self.recording_mux.get_state(Gst.CLOCK_TIME_NONE)
-                                        logger.warning(f"Recording mux state: {state}")
-                                    if self.recording_sink:
-                                        ret, state, pending = self.recording_sink.get_state(Gst.CLOCK_TIME_NONE)
-                                        logger.warning(f"Recording sink state: {state}")
-                                except Exception as e:
-                                    logger.debug(f"Could not check element states: {e}")
-                        else:
-                            no_data_count = 0
-                        if file_size != last_size:
-                            logger.info(f"📹 Recording: {elapsed:.1f}s elapsed, file size: {file_size} bytes (+{file_size - last_size} bytes)")
-                            last_size = file_size
-                        else:
-                            logger.info(f"📹 Recording: {elapsed:.1f}s elapsed, file size: {file_size} bytes (no change)")
-                    time.sleep(5)  # Log status every 5 seconds
+            self.recording_start_time = time.monotonic()
+            logger.info("Recording started: %s", location)
+            logger.debug("Recording queue config: max-size-bytes=%s, leaky=downstream", max_bytes)
             
-            monitor_thread = threading.Thread(target=monitor_recording)
-            monitor_thread.daemon = True
-            monitor_thread.start()
-            logger.debug("Started recording monitoring thread")
+            # Check recording progress every 5 seconds from the Qt event loop
+            self._rec_monitor_last_size = 0
+            self._rec_monitor_no_data_count = 0
+            self._rec_monitor_timer.start()
+            logger.debug("Started recording monitor timer")
             
             return True
             
         except Exception as e:
-            logger.error(f"Error starting recording: {e}", exc_info=True)
-            self._cleanup_recording_elements()
+            self._abort_recording_setup("start", e)
             return False
     
+    def _prepare_recording_bin(self, mux, max_bytes, segment_ns):
+        """Build the recording bin once and park it in the pipeline, unlinked.
+
+        Record the encoded H.264 stream: queue -> h264parse -> splitmuxsink,
+        built and configured by a single parse; the unlinked queue sink pad is
+        exposed as the bin's "sink" ghost pad. splitmuxsink's file sink is not
+        async, so adding the branch doesn't make the running pipeline lose
+        state and re-preroll. The queue is bounded by recording_queue_max_mb
+        only and drops its oldest buffers when full (leaky=downstream), so a
+        slow disk never back-pressures the tee and stalls live playback.
+
+        The bin's state is locked so reconnects (pipeline NULL -> PLAYING) leave
+        it parked in READY. It is reused by every later recording with the same
+        muxer and queue/segment settings, and only rebuilt when those change.
+        Raises GLib.Error if the description can't be parsed.
+        """
+        config = (mux, max_bytes, segment_ns)
+        if self.recording_bin is not None and self.recording_bin_config == config:
+            logger.debug("Reusing recording bin (muxer=%s)", mux)
+            return
+        self._discard_recording_bin()
+        recording_bin = Gst.parse_bin_from_description(
+            "queue name=recording_queue max-size-buffers=0 max-size-time=0 "
+            f"max-size-bytes={max_bytes} leaky=downstream "
+            "! h264parse name=recording_h264parse "
+            f"! splitmuxsink name=recording_sink muxer-factory={mux} "
+            f"max-size-time={segment_ns} send-keyframe-requests=true",
+            True)
+        recording_bin.set_name("recording_bin")
+        recording_bin.set_locked_state(True)
+        self.pipeline.add(recording_bin)
+        recording_bin.set_state(Gst.State.READY)
+        self.recording_bin = recording_bin
+        self.recording_bin_config = config
+        self.recording_queue = recording_bin.get_by_name("recording_queue")
+        self.recording_h264parse = recording_bin.get_by_name("recording_h264parse")
+        self.recording_sink = recording_bin.get_by_name("recording_sink")
+        self.recording_queue.connect("overrun", self._on_recording_queue_overrun)
+        logger.debug("Recording bin created and parked in READY (muxer=%s)", mux)
+
+    def _check_recording_progress(self):
+        """Log the recording file's growth; warn if no data reaches it."""
+        if not self.is_recording:
+            self._rec_monitor_timer.stop()
+            return
+        elapsed = time.monotonic() - self.recording_start_time if self.recording_start_time else 0
+        # One stat() per tick
+        try:
+            file_size = os.stat(self.recording_file_path).st_size
+        except (FileNotFoundError, TypeError):
+            return
+        last_size = self._rec_monitor_last_size
+        if file_size == last_size and file_size == 0 and elapsed > 5:
+            self._rec_monitor_no_data_count += 1
+            if self._rec_monitor_no_data_count >= 2:  # After 10 seconds with no data
+                logger.warning("⚠️ WARNING: Recording file still 0 bytes after %.1fs! No data flowing to recording pipeline.", elapsed)
+                # Check if recording elements are still in PLAYING state
+                try:
+                    if self.recording_queue:
+                        ret, state, pending = self.recording_queue.get_state(0)
+                        logger.warning("Recording queue state: %s", state)
+                    if self.recording_sink:
+                        ret, state, pending = self.recording_sink.get_state(0)
+                        logger.warning("Recording sink state: %s", state)
+                except Exception as e:
+                    logger.debug("Could not check element states: %s", e)
+        else:
+            self._rec_monitor_no_data_count = 0
+        if file_size != last_size:
+            logger.info("📹 Recording: %.1fs elapsed, file size: %s bytes (+%s bytes)", elapsed, file_size, file_size - last_size)
+            self._rec_monitor_last_size = file_size
+        else:
+            logger.info("📹 Recording: %.1fs elapsed, file size: %s bytes (no change)", elapsed, file_size)
+
+    def _on_recording_pad_blocked(self, pad, info):
+        """Blocking probe on the recording tee pad: link it to the recording queue.
+
+        Runs on the streaming thread while the pad is blocked, so the link happens
+        between two buffers without stalling the GUI thread.
+        """
+        recording_bin = self.recording_bin
+        bin_sink_pad = recording_bin.get_static_pad("sink") if recording_bin else None
+        if bin_sink_pad is None or bin_sink_pad.is_linked():
+            return Gst.PadProbeReturn.REMOVE
+        link_result = pad.link(bin_sink_pad)
+        if link_result != Gst.PadLinkReturn.OK:
+            logger.error("Failed to link tee pad to recording queue: %s", link_result)
+            # Tear down on the main thread
+            GLib.idle_add(self._recording_link_failed)
+            return Gst.PadProbeReturn.REMOVE
+        logger.info("Successfully linked tee pad to recording queue: %s", link_result)
+        # The recording really starts with this buffer, not when start_recording() returned
+        self.recording_start_time = time.monotonic()
+        # Emit from the main loop rather than across threads from here
+        GLib.idle_add(self._emit_recording_started)
+        return Gst.PadProbeReturn.REMOVE
+
+    def _on_recording_pad_idle(self, pad, info):
+        """Idle probe on the recording tee pad: unlink it and end the branch with EOS.
+
+        No buffer is in flight on the pad while this runs, so the branch is cut
+        cleanly; the pad itself is released by stop_recording once the file is
+        finalized.
+        """
+        peer = pad.get_peer()
+        if peer:
+            pad.unlink(peer)
+            peer.send_event(Gst.Event.new_eos())
+        return Gst.PadProbeReturn.REMOVE
+
+    def _emit_recording_started(self):
+        if self.is_recording and not self.is_stopping_recording:
+            self.sig_recording_changed.emit("recording")
+        return False  # One-shot
+
+    def _on_recording_queue_overrun(self, queue):
+        """Streaming thread: the recording queue is full and is dropping old buffers."""
+        self.recording_overruns += 1
+        # Log the first overrun and then every 100th, not every dropped buffer
+        if self.recording_overruns % 100 == 1:
+            logger.warning("Recording queue full (disk too slow?), dropping buffers (%d overruns)", self.recording_overruns)
+
+    def _recording_link_failed(self):
+        """Undo a recording branch whose tee pad could not be linked."""
+        self._reset_recording_branch()
+        self.sig_recording_changed.emit("stopped")
+        return False  # One-shot
+
+    def _abort_recording_setup(self, stage, exc=None):
+        """Log a failed start_recording stage and undo everything set up so far."""
+        if exc is not None:
+            logger.error("Recording setup failed at %s: %s", stage, exc, exc_info=True)
+        else:
+            logger.error("Recording setup failed at %s", stage)
+        self._reset_recording_branch()
+
+    def _reset_recording_branch(self):
+        """Release the tee pad, park the recording bin in READY, reset state."""
+        self._rec_monitor_timer.stop()
+        self._release_recording_tee_pad()
+        self._park_recording_bin()
+        self.is_recording = False
+        self.recording_file_path = None
+        self.recording_start_time = None
+
+    def _release_recording_tee_pad(self):
+        """Unlink and release the recording tee pad; the display branch is unaffected."""
+        if self.recording_tee_pad and self.tee:
+            try:
+                peer = self.recording_tee_pad.get_peer()
+                if peer:
+                    self.recording_tee_pad.unlink(peer)
+                self.tee.release_request_pad(self.recording_tee_pad)
+            except Exception as e:
+                logger.warning("Error releasing recording tee pad: %s", e)
+        self.recording_tee_pad = None
+
     def stop_recording(self):
         """Stop recording the video stream without affecting the main playback.
         
@@ -856,7 +762,7 @@ class Video(QOpenGLWidget):
         display pipeline continues to run normally, so the video stream will
         keep playing while recording stops.
         """
-        logger.debug(f"stop_recording called: is_recording={self.is_recording}, is_stopping_recording={self.is_stopping_recording}, file_path={self.recording_file_path}")
+        logger.debug("stop_recording called: is_recording=%s, is_stopping_recording=%s, file_path=%s", self.is_recording, self.is_stopping_recording, self.recording_file_path)
         if not self.is_recording:
             logger.warning("Recording is not active, ignoring stop_recording request")
             return
@@ -867,203 +773,91 @@ class Video(QOpenGLWidget):
             return
         
         self.is_stopping_recording = True
+        self._rec_monitor_timer.stop()
         
         try:
             saved_path = self.recording_file_path
-            recording_duration = time.time() - self.recording_start_time if self.recording_start_time else 0
-            logger.info(f"Stopping recording after {recording_duration:.2f} seconds: {saved_path}")
+            recording_duration = time.monotonic() - self.recording_start_time if self.recording_start_time else 0
+            logger.info("Stopping recording after %.2f seconds: %s", recording_duration, saved_path)
             
             # Update button to show "Saving" state
             self.sig_recording_changed.emit("saving")
             
-            # Send EOS to the queue to stop data flow and propagate through the pipeline
-            # The EOS will flow: queue -> h264parse -> mux -> sink
-            if self.recording_queue:
+            # Detach the branch from the tee between two buffers, then end it with
+            # EOS. The EOS will flow: queue -> h264parse -> mux -> sink
+            self._recording_finalized.clear()
+            if self.recording_tee_pad and self.recording_tee_pad.is_linked():
+                logger.debug("Unlinking recording tee pad and sending EOS to recording pipeline...")
+                # IDLE fires right away if no buffer is in flight, otherwise as
+                # soon as the current push returns; a stalled stream can't hold it
+                self.recording_tee_pad.add_probe(Gst.PadProbeType.IDLE, self._on_recording_pad_idle)
+            elif self.recording_queue:
                 logger.debug("Sending EOS to recording pipeline...")
                 self.recording_queue.send_event(Gst.Event.new_eos())
             else:
                 logger.warning("Recording queue is None, cannot send EOS")
             
-            # Wait for file to be finalized using a while loop
-            # Check file size stabilization instead of bus messages to avoid interference
+            # Wait for splitmuxsink to close the last fragment: it posts
+            # splitmuxsink-fragment-closed once the EOS has gone through the muxer
+            # and the file is finalized (see _on_bus_sync_element)
             logger.debug("Waiting for recording to finalize...")
+            if self._recording_finalized.wait(5.0):
+                logger.debug("Recording finalized")
+            else:
+                logger.warning("Timeout waiting for file finalization")
             
-            timeout = 5.0  # Maximum wait time in seconds
-            start_time = time.time()
-            file_finalized = False
-            last_size = 0
-            stable_count = 0
-            
-            # Wait for file size to stabilize (indicating muxer has finalized)
-            while (time.time() - start_time) < timeout:
-                if saved_path and os.path.exists(saved_path):
-                    current_size = os.path.getsize(saved_path)
-                    
-                    # If file exists and has content
-                    if current_size > 0:
-                        # Check if size is stable (hasn't changed for 3 consecutive checks)
-                        if current_size == last_size:
-                            stable_count += 1
-                            if stable_count >= 3:  # Stable for ~0.3 seconds
-                                logger.debug(f"File size stabilized at {current_size} bytes, recording finalized")
-                                file_finalized = True
-                                # Give muxer a bit more time to write final headers
-                                time.sleep(0.5)
-                                break
-                        else:
-                            stable_count = 0
-                            last_size = current_size
-                            logger.debug(f"File size changing: {current_size} bytes")
-                    else:
-                        # File exists but is empty, wait a bit more
-                        logger.debug("File exists but is empty, waiting...")
-                        time.sleep(0.2)
-                else:
-                    # File doesn't exist yet, wait a bit
-                    logger.debug("File doesn't exist yet, waiting...")
-                    time.sleep(0.2)
-                
-                # Small sleep to avoid busy waiting
-                time.sleep(0.1)
-            
-            if not file_finalized:
-                logger.warning("Timeout waiting for file finalization, ensuring minimum wait time...")
-                # Ensure we've waited at least 2 seconds for muxer to finalize
-                elapsed = time.time() - start_time
-                if elapsed < 2.0:
-                    logger.debug(f"Waiting additional {2.0 - elapsed:.2f} seconds for muxer finalization")
-                    time.sleep(2.0 - elapsed)
-            
-            # Now stop recording elements in reverse order (sink -> mux -> parse -> queue)
-            # This ensures proper cleanup without affecting the main pipeline
-            # IMPORTANT: Stop sink first to ensure file is flushed, then muxer
+            # Stop the recording bin with a single state change (the bin shuts its
+            # children down sink first, so the file is flushed before the muxer
+            # goes) and park it in READY for the next recording; READY also
+            # clears the EOS
             logger.debug("Stopping recording elements...")
+            self._park_recording_bin()
             
-            # Helper function to wait for element to reach NULL state
-            def wait_for_null_state(element, name):
-                if not element:
-                    logger.debug(f"{name} is None, skipping")
-                    return
-                logger.debug(f"Setting {name} to NULL state...")
-                ret = element.set_state(Gst.State.NULL)
-                if ret == Gst.StateChangeReturn.ASYNC:
-                    # Wait for async state change to complete
-                    timeout = 2.0
-                    start = time.time()
-                    while (time.time() - start) < timeout:
-                        ret_result, state, pending = element.get_state(Gst.CLOCK_TIME_NONE)
-                        if ret_result != Gst.StateChangeReturn.ASYNC:
-                            break
-                        if state == Gst.State.NULL:
-                            break
-                        time.sleep(0.1)
-                    logger.debug(f"{name} set to NULL state (async)")
-                elif ret == Gst.StateChangeReturn.FAILURE:
-                    logger.warning(f"Failed to set {name} to NULL state")
-                else:
-                    logger.debug(f"{name} set to NULL state (sync)")
-            
-            # Stop elements in reverse order and wait for each to complete
-            wait_for_null_state(self.recording_sink, "recording_sink")
-            wait_for_null_state(self.recording_mux, "recording_mux")
-            wait_for_null_state(self.recording_h264parse, "recording_h264parse")
-            wait_for_null_state(self.recording_queue, "recording_queue")
+            # Now release the (already unlinked) tee pad; the bin stays in the pipeline
+            logger.debug("Releasing recording tee pad...")
+            self._release_recording_tee_pad()
             
-            # Additional wait to ensure all state changes are complete
-            time.sleep(0.3)
-            logger.debug("All recording elements set to NULL state")
-            
-            # Now release the tee pad BEFORE removing elements
-            # This ensures the pad is properly unlinked
-            if self.recording_tee_pad and self.tee:
-                logger.debug("Releasing recording tee pad...")
-                # Unlink the pad first
-                peer = self.recording_tee_pad.get_peer()
-                if peer:
-                    self.recording_tee_pad.unlink(peer)
-                    logger.debug("Unlinked recording tee pad from peer")
-                # Set pad to inactive
-                self.recording_tee_pad.set_active(False)
-                # Release the pad - this won't affect the main display branch
-                self.tee.release_request_pad(self.recording_tee_pad)
-                self.recording_tee_pad = None
-                logger.debug("Released recording tee pad")
-            
-            # Now safely remove elements from pipeline (they should all be in NULL state)
-            self._cleanup_recording_elements()
-            
-            # Verify main pipeline is still playing (should not be affected)
-            # IMPORTANT: Check pipeline state BEFORE setting is_recording = False
-            # because EOS handler checks is_recording flag
+            # Verify main pipeline is still playing (should not be affected: the
+            # recording bin's EOS stays inside the bin, since the display sink
+            # never reached EOS). Non-blocking check; if playback did stop, recover
+            # through the reconnect path, which polls for PLAYING instead of waiting
             logger.debug("Checking main pipeline state after stopping recording...")
-            ret, state, pending = self.pipeline.get_state(Gst.CLOCK_TIME_NONE)
-            logger.debug(f"Main pipeline state after recording stop: {state}, pending: {pending}, application state: {self.state}")
-            
-            # Always ensure pipeline is in PLAYING if stream should be open
-            if self.state == VideoState.STATE_OPEN:
-                if state != Gst.State.PLAYING:
-                    logger.warning(f"Main pipeline state is {state} (expected PLAYING), restarting to ensure video continues...")
-                    # Set pipeline to NULL first, then to PLAYING to ensure clean restart
-                    self.pipeline.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                    ret = self.pipeline.set_state(Gst.State.PLAYING)
-                    logger.debug(f"Pipeline set_state(PLAYING) returned: {ret}")
-                    # Wait a bit for state change to propagate
-                    time.sleep(0.3)
-                    # Verify it reached PLAYING
-                    ret, new_state, new_pending = self.pipeline.get_state(Gst.CLOCK_TIME_NONE)
-                    if new_state == Gst.State.PLAYING:
-                        logger.info("Main pipeline successfully restarted to PLAYING state - video should continue")
-                    else:
-                        logger.warning(f"Main pipeline did not reach PLAYING state, current: {new_state}, pending: {new_pending}")
-                        # Try one more time
-                        self.pipeline.set_state(Gst.State.PLAYING)
-                        time.sleep(0.2)
-                else:
-                    logger.debug("Main pipeline is still in PLAYING state, video should continue")
-                    # Even if pipeline shows PLAYING, if EOS was received during recording,
-                    # the stream might have stopped. Force a restart to ensure stream continues.
-                    # This is safe because we're just restarting the same stream.
-                    logger.debug("EOS was received during recording, forcing pipeline restart to ensure stream continues...")
-                    self.pipeline.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                    ret = self.pipeline.set_state(Gst.State.PLAYING)
-                    logger.debug(f"Pipeline set_state(PLAYING) returned: {ret}")
-                    time.sleep(0.3)
-                    ret, final_state, final_pending = self.pipeline.get_state(Gst.CLOCK_TIME_NONE)
-                    if final_state == Gst.State.PLAYING:
-                        logger.info("Pipeline restarted after recording stop to handle EOS - video should continue")
-                    else:
-                        logger.warning(f"Pipeline restart after recording stop: state={final_state}, pending={final_pending}")
-            else:
-                logger.debug(f"Application state is {self.state}, not checking/restarting pipeline")
+            ret, state, pending = self.pipeline.get_state(0)
+            logger.debug("Main pipeline state after recording stop: %s, pending: %s, application state: %s", state, pending, self.state)
+            if self.state == VideoState.STATE_OPEN and state != Gst.State.PLAYING and pending != Gst.State.PLAYING:
+                logger.warning("Main pipeline state is %s (expected PLAYING), restarting to ensure video continues...", state)
+                self._schedule_reconnect()
             
             self.is_recording = False
             self.is_stopping_recording = False  # Clear stopping flag
             self.sig_recording_changed.emit("stopped")
-            logger.info(f"Recording stopped: {saved_path}")
+            logger.info("Recording stopped: %s", saved_path)
             self.recording_file_path = None
             
             # Verify file was created and has content
-            if saved_path and os.path.exists(saved_path):
-                file_size = os.path.getsize(saved_path)
+            try:
+                file_size = os.stat(saved_path).st_size
+            except (FileNotFoundError, TypeError):
+                file_size = None
+            if file_size is not None:
                 if file_size > 0:
-                    logger.info(f"✅ Recording file saved successfully: {saved_path} ({file_size} bytes)")
+                    logger.info("✅ Recording saved; last fragment: %s (%s bytes)", saved_path, file_size)
                 else:
-                    logger.warning(f"⚠️ Warning: Recording file is empty: {saved_path}")
+                    logger.warning("⚠️ Warning: Last recording fragment is empty: %s", saved_path)
             else:
-                logger.error(f"❌ Error: Recording file not found: {saved_path}")
+                logger.error("❌ Error: Last recording fragment not found: %s", saved_path)
             
         except Exception as e:
-            logger.error(f"Error stopping recording: {e}", exc_info=True)
-            self._cleanup_recording_elements()
+            logger.error("Error stopping recording: %s", e, exc_info=True)
+            self._release_recording_tee_pad()
+            self._park_recording_bin()
             self.is_recording = False
             self.is_stopping_recording = False  # Clear stopping flag
             self.sig_recording_changed.emit("stopped")
     
     def _auto_start_recording_after_reconnect(self):
         """Helper method to auto-start recording after reconnect if it was enabled before disconnect."""
-        logger.info(f"_auto_start_recording_after_reconnect called: auto_record_on_reconnect={self.auto_record_on_reconnect}, state={self.state}, is_recording={self.is_recording}")
+        logger.info("_auto_start_recording_after_reconnect called: auto_record_on_reconnect=%s, state=%s, is_recording=%s", self.auto_record_on_reconnect, self.state, self.is_recording)
         if self.auto_record_on_reconnect and self.state == VideoState.STATE_OPEN:
             # Wait a bit to ensure previous recording has fully stopped
             if self.is_recording:
@@ -1080,7 +874,7 @@ class Video(QOpenGLWidget):
                 # Retry once after a delay
                 QTimer.singleShot(2000, lambda: self._retry_auto_start_recording())
         else:
-            logger.debug(f"Not auto-starting recording: auto_record_on_reconnect={self.auto_record_on_reconnect}, state={self.state}")
+            logger.debug("Not auto-starting recording: auto_record_on_reconnect=%s, state=%s", self.auto_record_on_reconnect, self.state)
     
     def _retry_auto_start_recording(self):
         """Retry auto-starting recording if state is still open."""
@@ -1092,68 +886,44 @@ class Video(QOpenGLWidget):
             else:
                 logger.warning("⚠️ Failed to auto-start recording after retry")
     
-    def _cleanup_recording_elements(self):
-        """Remove recording elements from pipeline.
+    def _park_recording_bin(self):
+        """Stop the recording bin and leave it in the pipeline, in READY, for reuse."""
+        if not self.recording_bin:
+            return
+        logger.debug("Parking recording bin in READY state...")
+        ret = self.recording_bin.set_state(Gst.State.READY)
+        if ret == Gst.StateChangeReturn.FAILURE:
+            logger.warning("Failed to set recording_bin to READY state, discarding it")
+            self._discard_recording_bin()
+        elif ret == Gst.StateChangeReturn.ASYNC:
+            # Wait (bounded) for the async state change to complete
+            ret, state, pending = self.recording_bin.get_state(2 * Gst.SECOND)
+            if ret == Gst.StateChangeReturn.ASYNC:
+                logger.warning("recording_bin still changing state after 2s (%s -> %s), moving on", state, pending)
+
+    def _discard_recording_bin(self):
+        """Shut the recording bin down and remove it from the pipeline.
         
-        IMPORTANT: Elements must be in NULL state before removal.
-        This is ensured by calling this only after wait_for_null_state.
+        Only needed when the bin has to be rebuilt with a different muxer or
+        queue/segment settings, or when it failed to stop.
         """
-        logger.debug("Cleaning up recording elements...")
-        # Remove elements in reverse order of creation
-        if self.recording_sink:
-            try:
-                # Double-check state before removal
-                ret, state, pending = self.recording_sink.get_state(Gst.CLOCK_TIME_NONE)
-                if state != Gst.State.NULL:
-                    logger.warning(f"recording_sink is in {state} state, forcing NULL...")
-                    self.recording_sink.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                self.pipeline.remove(self.recording_sink)
-                logger.debug("Removed recording_sink from pipeline")
-            except Exception as e:
-                logger.error(f"Error removing recording_sink: {e}")
-            self.recording_sink = None
-            
-        if self.recording_mux:
-            try:
-                ret, state, pending = self.recording_mux.get_state(Gst.CLOCK_TIME_NONE)
-                if state != Gst.State.NULL:
-                    logger.warning(f"recording_mux is in {state} state, forcing NULL...")
-                    self.recording_mux.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                self.pipeline.remove(self.recording_mux)
-                logger.debug("Removed recording_mux from pipeline")
-            except Exception as e:
-                logger.error(f"Error removing recording_mux: {e}")
-            self.recording_mux = None
-            
-        if self.recording_h264parse:
+        if self.recording_bin:
+            logger.debug("Removing recording bin from pipeline...")
             try:
-                ret, state, pending = self.recording_h264parse.get_state(Gst.CLOCK_TIME_NONE)
-                if state != Gst.State.NULL:
-                    logger.warning(f"recording_h264parse is in {state} state, forcing NULL...")
-                    self.recording_h264parse.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                self.pipeline.remove(self.recording_h264parse)
-                logger.debug("Removed recording_h264parse from pipeline")
+                # Non-blocking probe; only shut it down if it isn't already NULL
+                ret, state, pending = self.recording_bin.get_state(0)
+                if not (ret == Gst.StateChangeReturn.SUCCESS and state == Gst.State.NULL):
+                    self.recording_bin.set_state(Gst.State.NULL)
+                    self.recording_bin.get_state(500 * Gst.MSECOND)
+                self.pipeline.remove(self.recording_bin)
+                logger.debug("Removed recording_bin from pipeline")
             except Exception as e:
-                logger.error(f"Error removing recording_h264parse: {e}")
-            self.recording_h264parse = None
-            
-        if self.recording_queue:
-            try:
-                ret, state, pending = self.recording_queue.get_state(Gst.CLOCK_TIME_NONE)
-                if state != Gst.State.NULL:
-                    logger.warning(f"recording_queue is in {state} state, forcing NULL...")
-                    self.recording_queue.set_state(Gst.State.NULL)
-                    time.sleep(0.1)
-                self.pipeline.remove(self.recording_queue)
-                logger.debug("Removed recording_queue from pipeline")
-            except Exception as e:
-                logger.error(f"Error removing recording_queue: {e}")
-            self.recording_queue = None
-        
-        logger.debug("Recording elements cleanup completed")
+                logger.error("Error removing recording_bin: %s", e)
+            self.recording_bin = None
+        self.recording_bin_config = None
+        self.recording_sink = None
+        self.recording_h264parse = None
+        self.recording_queue = None
 
     def __init__(self):
         super().__init__()
@@ -1163,7 +933,12 @@ class Video(QOpenGLWidget):
         # self.setPalette(palette)
         # self.setAutoFillBackground(True)
 
-        Gst.init(None)  # Initialize GStreamer
+        if USE_QOPENGLWIDGET:
+            self._video_window = self
+            self._video_container = None
+        else:
+            self._video_window = QOpenGLWindow()
+            self._video_container = QWidget.createWindowContainer(self._video_window, self)
 
         self.__create_pipeline()
         
@@ -1175,7 +950,7 @@ class Video(QOpenGLWidget):
         # Initialize bitrate tracking (bytes received from stream)
         self.bytes_received = 0
         self.bitrate_last_bytes = 0
-        self.metrics_last_time = time.time()
+        self.metrics_last_time = time.monotonic()
         self.current_bitrate_mbps = 0.0
         
         # Connect signal for auto-starting recording (signal is thread-safe)
@@ -1185,262 +960,247 @@ class Video(QOpenGLWidget):
         self._metrics_timer = QTimer()
         self._metrics_timer.timeout.connect(self._calculate_metrics)
 
-        self.__change_state(VideoState.STATE_CLOSE)
+        # Recording progress check (runs only while recording)
+        self._rec_monitor_timer = QTimer(self)
+        self._rec_monitor_timer.setInterval(5000)
+        self._rec_monitor_timer.timeout.connect(self._check_recording_progress)
+        self._rec_monitor_last_size = 0
+        self._rec_monitor_no_data_count = 0
 
-        self.bus_thread = threading.Thread(target=self.pipeline_bus_check)
-        self.bus_thread.daemon = True  # Allow main application to exit even if thread is still running
-        self.bus_thread.start()
+        self.__change_state(VideoState.STATE_CLOSE)
 
-    def pipeline_bus_check(self):
-        logger.debug("Pipeline bus check thread started")
+        # Reconnect bookkeeping (driven by the bus callbacks below)
+        self._timeout_counter = 0
+        self._reconnecting_counter = 0
+        self._reconnect_source_id = None
+        self._reconnect_delay_ms = RECONNECT_DELAY_MS
+        self._stop_wait_start = None
+
+        # The PLAYING transition is detected by polling the pipeline state instead
+        # of subscribing to STATE_CHANGED, which every element posts on startup
+        self._playing_poll_timer = QTimer()
+        self._playing_poll_timer.setInterval(PLAYING_POLL_INTERVAL_MS)
+        self._playing_poll_timer.timeout.connect(self._poll_playing_state)
+
+        # Bus messages are delivered on the main thread through a GLib signal watch
+        # (Qt's event loop dispatches the default GLib main context), so no polling
+        # thread is needed and only the message types we subscribe to reach Python
         bus = self.pipeline.get_bus()
-        timeout_counter = 0
-        reconnecting_counter = 0
-        while True:
-            msg = bus.timed_pop_filtered(Gst.CLOCK_TIME_NONE, Gst.MessageType.ERROR | Gst.MessageType.EOS | Gst.MessageType.WARNING | Gst.MessageType.STATE_CHANGED)
-            if msg is None:
-                continue
-            if self.state == VideoState.STATE_CLOSE or self.state == VideoState.STATE_OPEN:
-                timeout_counter = 0
-            msg_type = msg.type
-            if msg_type == Gst.MessageType.ERROR:
-                err, debug = msg.parse_error()
-                logger.error(f"❌ GStreamer Error: {err}, Debug: {debug}")
-                # Stop and save recording if active before reconnecting
-                if self.is_recording and not self.is_stopping_recording:
-                    logger.info("Stopping and saving recording due to disconnect (ERROR)...")
-                    # Set flag to auto-restart recording after reconnect
-                    self.auto_record_on_reconnect = True
-                    # Set stopping flag immediately so we don't reset pipeline too early
-                    self.is_stopping_recording = True
-                    # Stop recording (this will save it) - call from main thread via QTimer
-                    QTimer.singleShot(0, self.stop_recording)
-                    # Wait for recording to finish before reconnecting to avoid file corruption
-                    logger.debug("Waiting for recording to finish before reconnecting...")
-                    wait_start = time.time()
-                    while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                        time.sleep(0.5)
-                    if self.is_stopping_recording:
-                        logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                        self.is_stopping_recording = False  # Clear flag if timeout
-                elif self.is_stopping_recording:
-                    logger.info("Recording is already being stopped, waiting for it to finish...")
-                    wait_start = time.time()
-                    while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                        time.sleep(0.5)
-                    if self.is_stopping_recording:
-                        logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                        self.is_stopping_recording = False  # Clear flag if timeout
-                if (self.state == VideoState.STATE_OPEN):
-                    # If recording is active, remove recording elements before resetting pipeline
-                    if self.is_recording and not self.is_stopping_recording:
-                        logger.warning("Recording is active during reconnect, removing recording elements first...")
-                        # Preserve auto_record_on_reconnect flag if it's set
-                        preserve_auto_record = self.auto_record_on_reconnect
-                        # Force stop and remove recording elements immediately
-                        try:
-                            if self.recording_tee_pad and self.tee:
-                                try:
-                                    peer = self.recording_tee_pad.get_peer()
-                                    if peer:
-                                        self.recording_tee_pad.unlink(peer)
-                                    self.recording_tee_pad.set_active(False)
-                                    self.tee.release_request_pad(self.recording_tee_pad)
-                                except Exception as e:
-                                    logger.warning(f"Error releasing tee pad: {e}")
-                                self.recording_tee_pad = None
-                            self._cleanup_recording_elements()
-                            self.is_recording = False
-                            self.is_stopping_recording = False
-                            # Restore auto_record_on_reconnect flag if it was set
-                            if preserve_auto_record:
-                                self.auto_record_on_reconnect = True
-                                logger.info("Preserved auto_record_on_reconnect flag after removing recording elements")
-                            logger.info("Recording elements removed before pipeline reset")
-                        except Exception as e:
-                            logger.error(f"Error removing recording elements: {e}", exc_info=True)
-                    reconnecting_counter += 1
-                    logger.warning(f"Reconnecting (attempt {reconnecting_counter})...")
-                    self.pipeline.set_state(Gst.State.NULL)
-                    self.pipeline.set_state(Gst.State.PLAYING)
-                    time.sleep(1)
-                elif (self.state == VideoState.STATE_CONNECTING):
-                    timeout_counter += 1
-                    reconnecting_counter += 1
-                    logger.warning(f"Reconnecting (attempt {reconnecting_counter}, timeout_counter={timeout_counter})...")
-                    self.pipeline.set_state(Gst.State.NULL)
-                    self.pipeline.set_state(Gst.State.PLAYING)
-                    logger.debug(f"Timeout counter: {timeout_counter} over 10")
-                    if timeout_counter > 10:
-                        logger.error("Timeout reached, closing stream...")
-                        self.pipeline.set_state(Gst.State.NULL)
-                        self.__change_state(VideoState.STATE_CLOSE)
-                    time.sleep(1)
-            elif msg_type == Gst.MessageType.EOS:
-                src_name = "unknown"
-                if hasattr(msg.src, 'name'):
-                    src_name = msg.src.name
-                logger.info(f"✅ End of Stream reached from element: {src_name}")
-                # Stop and save recording if active before reconnecting
-                if self.is_recording and not self.is_stopping_recording:
-                    logger.info("Stopping and saving recording due to disconnect (EOS)...")
-                    # Set flag to auto-restart recording after reconnect
-                    self.auto_record_on_reconnect = True
-                    # Set stopping flag immediately so we don't reset pipeline too early
-                    self.is_stopping_recording = True
-                    # Stop recording (this will save it) - call from main thread via QTimer
-                    QTimer.singleShot(0, self.stop_recording)
-                    # Wait for recording to finish before reconnecting to avoid file corruption
-                    logger.debug("Waiting for recording to finish before reconnecting...")
-                    wait_start = time.time()
-                    while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                        time.sleep(0.5)
-                    if self.is_stopping_recording:
-                        logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                        self.is_stopping_recording = False  # Clear flag if timeout
-                elif self.is_stopping_recording:
-                    logger.info("Recording is already being stopped, waiting for it to finish...")
-                    wait_start = time.time()
-                    while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                        time.sleep(0.5)
-                    if self.is_stopping_recording:
-                        logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                        self.is_stopping_recording = False  # Clear flag if timeout
-                if (self.state == VideoState.STATE_OPEN):
-                    # If recording is active, remove recording elements before resetting pipeline
-                    if self.is_recording and not self.is_stopping_recording:
-                        logger.warning("Recording is active during reconnect after EOS, removing recording elements first...")
-                        # Preserve auto_record_on_reconnect flag if it's set
-                        preserve_auto_record = self.auto_record_on_reconnect
-                        # Force stop and remove recording elements immediately
-                        try:
-                            if self.recording_tee_pad and self.tee:
-                                try:
-                                    peer = self.recording_tee_pad.get_peer()
-                                    if peer:
-                                        self.recording_tee_pad.unlink(peer)
-                                    self.recording_tee_pad.set_active(False)
-                                    self.tee.release_request_pad(self.recording_tee_pad)
-                                except Exception as e:
-                                    logger.warning(f"Error releasing tee pad: {e}")
-                                self.recording_tee_pad = None
-                            self._cleanup_recording_elements()
-                            self.is_recording = False
-                            self.is_stopping_recording = False
-                            # Restore auto_record_on_reconnect flag if it was set
-                            if preserve_auto_record:
-                                self.auto_record_on_reconnect = True
-                                logger.info("Preserved auto_record_on_reconnect flag after removing recording elements")
-                            logger.info("Recording elements removed before pipeline reset")
-                        except Exception as e:
-                            logger.error(f"Error removing recording elements: {e}", exc_info=True)
-                    reconnecting_counter += 1
-                    logger.warning(f"Reconnecting after EOS (attempt {reconnecting_counter})...")
-                    self.pipeline.set_state(Gst.State.NULL)
-                    self.pipeline.set_state(Gst.State.PLAYING)
-                    time.sleep(1)
-                else:
-                    logger.info("Stream ended, closing...")
-                    self.__change_state(VideoState.STATE_CLOSE)
-            elif msg_type == Gst.MessageType.WARNING:
-                warn, debug = msg.parse_warning()
-                logger.warning(f"⚠️ GStreamer Warning: {warn}, Debug: {debug}")
-                if "Could not read from resource." in str(warn):
-                    # Stop and save recording if active before reconnecting
-                    if self.is_recording and not self.is_stopping_recording:
-                        logger.info("Stopping and saving recording due to disconnect (resource read error)...")
-                        # Set flag to auto-restart recording after reconnect
-                        self.auto_record_on_reconnect = True
-                        # Set stopping flag immediately so we don't reset pipeline too early
-                        self.is_stopping_recording = True
-                        # Stop recording (this will save it) - call from main thread via QTimer
-                        QTimer.singleShot(0, self.stop_recording)
-                        # Wait for recording to finish before reconnecting to avoid file corruption
-                        logger.debug("Waiting for recording to finish before reconnecting...")
-                        wait_start = time.time()
-                        while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                            time.sleep(0.5)
-                        if self.is_stopping_recording:
-                            logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                            self.is_stopping_recording = False  # Clear flag if timeout
-                    elif self.is_stopping_recording:
-                        logger.info("Recording is already being stopped, waiting for it to finish...")
-                        wait_start = time.time()
-                        while self.is_stopping_recording and (time.time() - wait_start) < 15:
-                            time.sleep(0.5)
-                        if self.is_stopping_recording:
-                            logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
-                            self.is_stopping_recording = False  # Clear flag if timeout
-                    if (self.state == VideoState.STATE_OPEN):
-                        # If recording is active, remove recording elements before resetting pipeline
-                        if self.is_recording and not self.is_stopping_recording:
-                            logger.warning("Recording is active during reconnect after resource error, removing recording elements first...")
-                            # Preserve auto_record_on_reconnect flag if it's set
-                            preserve_auto_record = self.auto_record_on_reconnect
-                            # Force stop and remove recording elements immediately
-                            try:
-                                if self.recording_tee_pad and self.tee:
-                                    try:
-                                        peer = self.recording_tee_pad.get_peer()
-                                        if peer:
-                                            self.recording_tee_pad.unlink(peer)
-                                        self.recording_tee_pad.set_active(False)
-                                        self.tee.release_request_pad(self.recording_tee_pad)
-                                    except Exception as e:
-                                        logger.warning(f"Error releasing tee pad: {e}")
-                                    self.recording_tee_pad = None
-                                self._cleanup_recording_elements()
-                                self.is_recording = False
-                                self.is_stopping_recording = False
-                                # Restore auto_record_on_reconnect flag if it was set
-                                if preserve_auto_record:
-                                    self.auto_record_on_reconnect = True
-                                    logger.info("Preserved auto_record_on_reconnect flag after removing recording elements")
-                                logger.info("Recording elements removed before pipeline reset")
-                            except Exception as e:
-                                logger.error(f"Error removing recording elements: {e}", exc_info=True)
-                        reconnecting_counter += 1
-                        logger.warning(f"Reconnecting after resource read error (attempt {reconnecting_counter})...")
-                        self.pipeline.set_state(Gst.State.NULL)
-                        self.pipeline.set_state(Gst.State.PLAYING)
-                        time.sleep(1)
-            elif msg_type == Gst.MessageType.STATE_CHANGED:
-                old_state, new_state, pending = msg.parse_state_changed()
-                src = msg.src  # The element that changed state
-                logger.debug(f"🔄 State changed: {src.name if hasattr(src, 'name') else 'unknown'}: {old_state} → {new_state} (Pending: {pending})")
-                if hasattr(src, 'name') and src.name == "rtsp-pipeline" and new_state == Gst.State.PLAYING:
-                    timeout_counter = 0
-                    reconnecting_counter = 0
-                    logger.debug("Pipeline reached PLAYING state, resetting counters")
-                    self.__change_state(VideoState.STATE_OPEN)
+        bus.add_signal_watch()
+        bus.connect("message::error", self._on_bus_error)
+        bus.connect("message::eos", self._on_bus_eos)
+        bus.connect("message::warning", self._on_bus_warning)
+        bus.connect("message::element", self._on_bus_element)
+        bus.connect("message::async-done", self._on_bus_async_done)
+        # stop_recording blocks the main thread while the last fragment is
+        # finalized, so that one message is caught by a sync handler instead
+        self._recording_finalized = threading.Event()
+        bus.enable_sync_message_emission()
+        bus.connect("sync-message::element", self._on_bus_sync_element)
+
+    def _reset_timeout_counter(self):
+        if self.state == VideoState.STATE_CLOSE or self.state == VideoState.STATE_OPEN:
+            self._timeout_counter = 0
+
+    def _on_bus_error(self, bus, msg):
+        self._reset_timeout_counter()
+        err, debug = msg.parse_error()
+        logger.error("❌ GStreamer Error: %s, Debug: %s", err, debug)
+        self._handle_disconnect("ERROR")
+
+    def _on_bus_eos(self, bus, msg):
+        self._reset_timeout_counter()
+        logger.info("✅ End of Stream reached from element: %s", msg.src.get_name() if msg.src else "unknown")
+        self._handle_disconnect("EOS")
+
+    def _on_bus_warning(self, bus, msg):
+        self._reset_timeout_counter()
+        warn, debug = msg.parse_warning()
+        logger.warning("⚠️ GStreamer Warning: %s, Debug: %s", warn, debug)
+        # GError.matches() compares the domain quark and code; PyGObject exposes
+        # .domain as a string, so it can't be compared to the quark directly
+        if warn.matches(Gst.ResourceError.quark(), Gst.ResourceError.READ):
+            self._handle_disconnect("resource read error")
+
+    def _on_bus_element(self, bus, msg):
+        structure = msg.get_structure()
+        if structure is not None and structure.get_name() == "splitmuxsink-fragment-opened":
+            # Track the fragment being written for the size checks and logs
+            self.recording_file_path = structure.get_string("location")
+            # The progress check starts over on the new (empty) file
+            self._rec_monitor_last_size = 0
+            self._rec_monitor_no_data_count = 0
+            logger.info("Recording to fragment: %s", self.recording_file_path)
+
+    def _on_bus_sync_element(self, bus, msg):
+        """Streaming thread: flag the end of the recording once its last fragment is closed."""
+        if not self.is_stopping_recording or msg.src != self.recording_sink:
+            return
+        structure = msg.get_structure()
+        if structure is not None and structure.get_name() == "splitmuxsink-fragment-closed":
+            self._recording_finalized.set()
+
+    def _wait_for_playing(self):
+        """Start polling for the pipeline's PLAYING transition after set_state(PLAYING)."""
+        self._playing_poll_timer.start()
+
+    def _on_bus_async_done(self, bus, msg):
+        # Only the top-level pipeline posts ASYNC_DONE on this bus (bins keep their
+        # children's); check right away rather than on the next poll tick
+        if self._playing_poll_timer.isActive():
+            self._poll_playing_state()
+
+    def _poll_playing_state(self):
+        # Timeout 0: non-blocking, just reads the current state
+        ret, state, pending = self.pipeline.get_state(0)
+        if state == Gst.State.PLAYING:
+            self._playing_poll_timer.stop()
+            self._timeout_counter = 0
+            self._reconnecting_counter = 0
+            self._reconnect_delay_ms = RECONNECT_DELAY_MS
+            logger.debug("Pipeline reached PLAYING state, resetting counters")
+            self.__change_state(VideoState.STATE_OPEN)
+
+    def _handle_disconnect(self, reason):
+        """Save an active recording, then reconnect or close depending on state.
+
+        reason is "ERROR", "EOS" or "resource read error".
+        """
+        if not self._stop_recording_for_disconnect(reason):
+            return
+        after = "" if reason == "ERROR" else f" after {reason}"
+        if self.state == VideoState.STATE_OPEN:
+            # If recording is active, remove recording elements before resetting pipeline
+            if self.is_recording and not self.is_stopping_recording:
+                self._remove_recording_for_reconnect(after)
+            self._reconnecting_counter += 1
+            logger.warning("Reconnecting%s (attempt %s)...", after, self._reconnecting_counter)
+            self._schedule_reconnect()
+        elif reason == "ERROR" and self.state == VideoState.STATE_CONNECTING:
+            self._timeout_counter += 1
+            self._reconnecting_counter += 1
+            logger.warning("Reconnecting (attempt %s, timeout_counter=%s)...", self._reconnecting_counter, self._timeout_counter)
+            logger.debug("Timeout counter: %s over 10", self._timeout_counter)
+            if self._timeout_counter > 10:
+                logger.error("Timeout reached, closing stream...")
+                self._cancel_reconnect()
+                self.pipeline.set_state(Gst.State.NULL)
+                self.__change_state(VideoState.STATE_CLOSE)
             else:
-                logger.debug(f"📢 Other Message: {msg_type}")
+                self._schedule_reconnect()
+        elif reason == "EOS":
+            logger.info("Stream ended, closing...")
+            self.__change_state(VideoState.STATE_CLOSE)
+
+    def _stop_recording_for_disconnect(self, reason):
+        """Stop and save an active recording before reconnecting to avoid file corruption.
+
+        Returns False if a stop is already in progress (we were re-entered from
+        its event processing); the disconnect is then handled again shortly,
+        for at most 15 seconds, instead of blocking the main loop.
+        """
+        if self.is_recording and not self.is_stopping_recording:
+            logger.info("Stopping and saving recording due to disconnect (%s)...", reason)
+            # Set flag to auto-restart recording after reconnect
+            self.auto_record_on_reconnect = True
+            self.stop_recording()
+        elif self.is_stopping_recording:
+            if self._stop_wait_start is None:
+                logger.info("Recording is already being stopped, waiting for it to finish...")
+                self._stop_wait_start = time.monotonic()
+            if time.monotonic() - self._stop_wait_start < 15:
+                QTimer.singleShot(500, lambda: self._handle_disconnect(reason))
+                return False
+            logger.warning("Timeout waiting for recording to stop, proceeding with reconnect anyway")
+            self.is_stopping_recording = False  # Clear flag if timeout
+        self._stop_wait_start = None
+        return True
+
+    def _remove_recording_for_reconnect(self, after):
+        """Force-detach the recording branch so the pipeline can be reset."""
+        logger.warning("Recording is active during reconnect%s, removing recording elements first...", after)
+        # Preserve auto_record_on_reconnect flag if it's set
+        preserve_auto_record = self.auto_record_on_reconnect
+        # Force stop and remove recording elements immediately
+        try:
+            self._rec_monitor_timer.stop()
+            self._release_recording_tee_pad()
+            self._park_recording_bin()
+            self.is_recording = False
+            self.is_stopping_recording = False
+            # Restore auto_record_on_reconnect flag if it was set
+            if preserve_auto_record:
+                self.auto_record_on_reconnect = True
+                logger.info("Preserved auto_record_on_reconnect flag after removing recording elements")
+            logger.info("Recording elements removed before pipeline reset")
+        except Exception as e:
+            logger.error("Error removing recording elements: %s", e, exc_info=True)
+
+    def _schedule_reconnect(self):
+        """Reset the pipeline now and set it back to PLAYING after a back-off delay.
+
+        The delay starts at RECONNECT_DELAY_MS and doubles with every failed
+        attempt up to RECONNECT_MAX_DELAY_MS; it is reset once PLAYING is reached.
+        It runs as a GLib timeout instead of a sleep, so the main loop (and the
+        bus) keep running while we wait.
+        """
+        self._playing_poll_timer.stop()
+        self.pipeline.set_state(Gst.State.NULL)
+        if self._reconnect_source_id is None:
+            logger.debug("Reconnecting in %s ms", self._reconnect_delay_ms)
+            self._reconnect_source_id = GLib.timeout_add(self._reconnect_delay_ms, self._reconnect)
+            self._reconnect_delay_ms = min(self._reconnect_delay_ms * 2, RECONNECT_MAX_DELAY_MS)
+
+    def _reconnect(self):
+        self._reconnect_source_id = None
+        if self.state != VideoState.STATE_CLOSE:
+            self.pipeline.set_state(Gst.State.PLAYING)
+            self._wait_for_playing()
+        return False  # One-shot
+
+    def _cancel_reconnect(self):
+        self._playing_poll_timer.stop()
+        if self._reconnect_source_id is not None:
+            GLib.source_remove(self._reconnect_source_id)
+            self._reconnect_source_id = None
 
     def resizeEvent(self, event):
-        print(f"Video resized to: {event.size().width()}x{event.size().height()}")
+        size = event.size()
+        now = time.monotonic()
+        if now - self._last_resize_log > RESIZE_LOG_INTERVAL_S:
+            self._last_resize_log = now
+            logger.debug("Video resized to: %dx%d", size.width(), size.height())
+        if self._video_container is not None:
+            self._video_container.setGeometry(0, 0, size.width(), size.height())
 
     def closeEvent(self, event):
         self.close_stream()
+        # Also covers a stream that already dropped to CLOSE on its own
+        self._discard_recording_bin()
+
+# libyaml's C loader/dumper when PyYAML was built with it, pure Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 def _load_yaml(path):
     """Load YAML file, return None on error."""
     try:
         with open(path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YAML_LOADER)
     except (yaml.YAMLError, IOError) as e:
-        logger.error(f"Error loading {path}: {e}")
+        logger.error("Error loading %s: %s", path, e)
         return None
 
 def load_settings():
     """Load settings from configuration file (YAML format)."""
-    logger.debug(f"Loading settings from {CONFIG_FILE}")
+    logger.debug("Loading settings from %s", CONFIG_FILE)
     # Copy default config if config file doesn't exist
     if not os.path.exists(CONFIG_FILE) and os.path.exists(DEFAULT_CONFIG_FILE):
         try:
             shutil.copy2(DEFAULT_CONFIG_FILE, CONFIG_FILE)
-            logger.info(f"Created {CONFIG_FILE} from {DEFAULT_CONFIG_FILE}")
+            logger.info("Created %s from %s", CONFIG_FILE, DEFAULT_CONFIG_FILE)
         except IOError as e:
-            logger.error(f"Error copying default config file: {e}")
+            logger.error("Error copying default config file: %s", e)
     
     # Load defaults from default config file, merge with DEFAULT_SETTINGS for any missing keys
     default_settings = None
@@ -1471,21 +1231,53 @@ def load_settings():
             else:
                 settings["urls"] = default_settings.get("urls", [])
             return settings
-        logger.error(f"Error loading config file. Using defaults.")
+        logger.error("Error loading config file. Using defaults.")
     
     return default_settings
 
 def save_settings(settings):
     """Save settings to configuration file (YAML format)."""
-    logger.debug(f"Saving settings to {CONFIG_FILE}")
+    logger.debug("Saving settings to %s", CONFIG_FILE)
     try:
         with open(CONFIG_FILE, 'w') as f:
-            yaml.dump(settings, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            yaml.dump(settings, f, Dumper=_YAML_DUMPER, default_flow_style=False, allow_unicode=True, sort_keys=False)
         logger.debug("Settings saved successfully")
     except IOError as e:
-        logger.error(f"Error saving config file: {e}")
+        logger.error("Error saving config file: %s", e)
+
+# In-memory settings, loaded once and written back by _flush_settings()
+_SETTINGS_CACHE = None
+_SETTINGS_FLUSH_TIMER = None
+SETTINGS_FLUSH_DELAY_MS = 500
+
+def get_settings():
+    """Return the process-wide settings dict, loading it from disk on first use."""
+    global _SETTINGS_CACHE
+    if _SETTINGS_CACHE is None:
+        _SETTINGS_CACHE = load_settings()
+    return _SETTINGS_CACHE
+
+def _flush_settings():
+    """Write the cached settings to disk."""
+    if _SETTINGS_FLUSH_TIMER is not None:
+        _SETTINGS_FLUSH_TIMER.stop()
+    if _SETTINGS_CACHE is not None:
+        save_settings(_SETTINGS_CACHE)
+
+def schedule_settings_flush():
+    """Debounce settings writes: flush once changes stop for SETTINGS_FLUSH_DELAY_MS."""
+    global _SETTINGS_FLUSH_TIMER
+    if _SETTINGS_FLUSH_TIMER is None:
+        _SETTINGS_FLUSH_TIMER = QTimer()
+        _SETTINGS_FLUSH_TIMER.setSingleShot(True)
+        _SETTINGS_FLUSH_TIMER.setInterval(SETTINGS_FLUSH_DELAY_MS)
+        _SETTINGS_FLUSH_TIMER.timeout.connect(_flush_settings)
+    # start() restarts a running timer
+    _SETTINGS_FLUSH_TIMER.start()
 
 class Open(QWidget):
+    _last_resize_log = 0.0
+
     def __init__(self, initial_url_index=0, urls_list=None):
         super().__init__()
         loadUi("ui/Open.ui", self)
@@ -1498,10 +1290,11 @@ class Open(QWidget):
         # self.setPalette(palette)
         # self.setAutoFillBackground(True)  # Required for palette to take effect
 
-        comboBox_URL = self.findChild(QComboBox, "comboBox_URL")
-        comboBox_URL.addItems([url["name"] for url in urls_list])
-        comboBox_URL.setCurrentIndex(initial_url_index)
-        comboBox_URL.currentIndexChanged.connect(self.on_url_changed)
+        # loadUi() exposes named children as attributes (self.comboBox_URL,
+        # self.pushButton_Open, self.line_Open); use those instead of findChild()
+        self.comboBox_URL.addItems([url.name for url in urls_list])
+        self.comboBox_URL.setCurrentIndex(initial_url_index)
+        self.comboBox_URL.currentIndexChanged.connect(self.on_url_changed)
         
         # Add record button
         self.pushButton_Record = QPushButton("Record", self)
@@ -1517,29 +1310,49 @@ class Open(QWidget):
         self.label_FPS = QLabel("FPS: 0.0", self)
         self.label_FPS.setStyleSheet("color: green; font-weight: bold;")
 
+        # Last state applied by sig_recording_changed
+        self._last_record_state = None
+
     
     def on_url_changed(self, index):
         """Save URL index when changed."""
-        settings = load_settings()
-        settings["url_index"] = index
-        save_settings(settings)
+        get_settings()["url_index"] = index
+        schedule_settings_flush()
         
 
     def resizeEvent(self, event):
-        print(f"Open resized to: {event.size().width()}x{event.size().height()}")
-        comboBox_URL = self.findChild(QComboBox, "comboBox_URL")
-        pushButton_Open = self.findChild(QPushButton, "pushButton_Open")
-        line_Open = self.findChild(QFrame, "line_Open")
-        pushButton_Open.setGeometry(FONT_SIZE_PIXELS, int(event.size().height()/2 - FONT_SIZE_PIXELS*1.2), FONT_SIZE_PIXELS * 8, FONT_SIZE_PIXELS * 2)
+        size = event.size()
+        w = size.width()
+        h = size.height()
+        now = time.monotonic()
+        if now - self._last_resize_log > RESIZE_LOG_INTERVAL_S:
+            self._last_resize_log = now
+            logger.debug("Open resized to: %dx%d", w, h)
+        F = FONT_SIZE_PIXELS
+        y = int(h/2 - F*1.2)
+        bh = F * 2
+        pushButton_Open = self.pushButton_Open
+        pushButton_Record = self.pushButton_Record
+        pushButton_Publish = self.pushButton_Publish
+        label_FPS = self.label_FPS
+        line_Open = self.line_Open
+        # Batch the geometry changes into a single repaint
+        self.setUpdatesEnabled(False)
+        pushButton_Open.setGeometry(F, y, F * 8, bh)
         # Position record button next to Open button
-        self.pushButton_Record.setGeometry(pushButton_Open.x() + pushButton_Open.width() + FONT_SIZE_PIXELS, int(event.size().height()/2 - FONT_SIZE_PIXELS*1.2), FONT_SIZE_PIXELS * 8, FONT_SIZE_PIXELS * 2)
+        x = pushButton_Open.x() + pushButton_Open.width() + F
+        pushButton_Record.setGeometry(x, y, F * 8, bh)
         # Position publish button next to Record button
-        self.pushButton_Publish.setGeometry(self.pushButton_Record.x() + self.pushButton_Record.width() + FONT_SIZE_PIXELS, int(event.size().height()/2 - FONT_SIZE_PIXELS*1.2), FONT_SIZE_PIXELS * 10, FONT_SIZE_PIXELS * 2)
+        x = pushButton_Record.x() + pushButton_Record.width() + F
+        pushButton_Publish.setGeometry(x, y, F * 10, bh)
         # Position FPS label after Publish button
-        self.label_FPS.setGeometry(self.pushButton_Publish.x() + self.pushButton_Publish.width() + FONT_SIZE_PIXELS, int(event.size().height()/2 - FONT_SIZE_PIXELS*1.2), FONT_SIZE_PIXELS * 6, FONT_SIZE_PIXELS * 2)
+        x = pushButton_Publish.x() + pushButton_Publish.width() + F
+        label_FPS.setGeometry(x, y, F * 6, bh)
         # Adjust combo box to account for all buttons and FPS label
-        comboBox_URL.setGeometry(self.label_FPS.x() + self.label_FPS.width() + FONT_SIZE_PIXELS, int(event.size().height()/2 - FONT_SIZE_PIXELS*1.2), event.size().width() - self.label_FPS.x() - self.label_FPS.width() - FONT_SIZE_PIXELS*2, FONT_SIZE_PIXELS * 2)
-        line_Open.setGeometry(0, int(event.size().height() - FONT_SIZE_PIXELS), event.size().width(), line_Open.height())
+        x = label_FPS.x() + label_FPS.width()
+        self.comboBox_URL.setGeometry(x + F, y, w - x - F*2, bh)
+        line_Open.setGeometry(0, h - F, w, line_Open.height())
+        self.setUpdatesEnabled(True)
     
     def on_record_button_clicked(self):
         """Handle record button click - will be connected to Video widget."""
@@ -1549,43 +1362,54 @@ class Open(QWidget):
         """Handle publish button click - will be connected to Player widget."""
         pass  # This will be handled by the Player class
 
+    @pyqtSlot(VideoState)
     def sig_state_changed(self, state):
-        comboBox_URL = self.findChild(QComboBox, "comboBox_URL")
-        pushButton_Open = self.findChild(QPushButton, "pushButton_Open")
-        if state == VideoState.STATE_OPEN:
-            comboBox_URL.setEnabled(False)
-            pushButton_Open.setEnabled(True)
-            pushButton_Open.setText("Close")
-            self.pushButton_Record.setEnabled(True)
-        elif state == VideoState.STATE_CLOSE:
-            comboBox_URL.setEnabled(True)
-            pushButton_Open.setEnabled(True)
-            pushButton_Open.setText("Open")
-            self.pushButton_Record.setEnabled(False)
-            self.pushButton_Record.setText("Record")
-        elif state == VideoState.STATE_CONNECTING:
-            comboBox_URL.setEnabled(False)
-            pushButton_Open.setEnabled(True)
-            pushButton_Open.setText("Connecting...")
-            self.pushButton_Record.setEnabled(False)
+        comboBox_URL = self.comboBox_URL
+        pushButton_Open = self.pushButton_Open
+        pushButton_Record = self.pushButton_Record
+        # Batch the property changes into a single repaint
+        self.setUpdatesEnabled(False)
+        try:
+            if state == VideoState.STATE_OPEN:
+                comboBox_URL.setEnabled(False)
+                pushButton_Open.setEnabled(True)
+                pushButton_Open.setText("Close")
+                pushButton_Record.setEnabled(True)
+            elif state == VideoState.STATE_CLOSE:
+                comboBox_URL.setEnabled(True)
+                pushButton_Open.setEnabled(True)
+                pushButton_Open.setText("Open")
+                pushButton_Record.setEnabled(False)
+                pushButton_Record.setText("Record")
+                # The button was changed behind sig_recording_changed's back
+                self._last_record_state = None
+            elif state == VideoState.STATE_CONNECTING:
+                comboBox_URL.setEnabled(False)
+                pushButton_Open.setEnabled(True)
+                pushButton_Open.setText("Connecting...")
+                pushButton_Record.setEnabled(False)
+        finally:
+            # Re-enabling updates repaints the widget once
+            self.setUpdatesEnabled(True)
     
+    @pyqtSlot(str)
     def sig_recording_changed(self, state):
         """Update record button text based on recording state."""
+        # setStyleSheet() re-polishes the button: only touch it on a real change
+        if state == self._last_record_state:
+            return
+        self._last_record_state = state
         if state == "recording":
             self.pushButton_Record.setText("Stop Recording")
-            self.pushButton_Record.setStyleSheet("background-color: red; color: white;")
+            self.pushButton_Record.setStyleSheet(_SS_RECORDING)
             # Button should already be enabled (stream is open)
         elif state == "saving":
-            # Only update if not already in saving state (to avoid flicker)
-            if self.pushButton_Record.text() != "Saving...":
-                self.pushButton_Record.setText("Saving...")
-                self.pushButton_Record.setStyleSheet("background-color: orange; color: white;")
-                self.pushButton_Record.setEnabled(False)  # Disable button while saving
-            # Force UI update
-            QApplication.processEvents()
+            self.pushButton_Record.setText("Saving...")
+            self.pushButton_Record.setStyleSheet(_SS_SAVING)
+            self.pushButton_Record.setEnabled(False)  # Disable button while saving
         else:  # "stopped"
             self.pushButton_Record.setText("Record")
-            self.pushButton_Record.setStyleSheet("")
+            self.pushButton_Record.setStyleSheet(_SS_IDLE)
             # Re-enable button after saving (it was disabled during saving)
             # If stream is closed, start_recording will check and fail anyway
             self.pushButton_Record.setEnabled(True)
@@ -1604,16 +1428,24 @@ class Player(QWidget):
         # self.setPalette(palette)
         # self.setAutoFillBackground(True)  # Required for palette to take effect
 
-        layout = QVBoxLayout()
-        self.setLayout(layout)
+        # Qt lays the children out: the Open bar on top at a fixed height, the
+        # video (filling frame_player) takes the rest above a small bottom margin
+        F = FONT_SIZE_PIXELS
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, int(F + F/2))
+        layout.setSpacing(0)
 
         self.widgetOpen = Open(initial_url_index, urls_list)
-        self.layout().addWidget(self.widgetOpen)
+        self.widgetOpen.setFixedHeight(F * 4)
+        layout.addWidget(self.widgetOpen)
 
         self.widgetVideo = Video()
-        self.layout().addWidget(self.widgetVideo)
+        frame_layout = QVBoxLayout(self.frame_player)
+        frame_layout.setContentsMargins(0, 0, 0, 0)
+        frame_layout.addWidget(self.widgetVideo)
+        layout.addWidget(self.frame_player, 1)
 
-        pushButton_Open = self.widgetOpen.findChild(QPushButton, "pushButton_Open")
+        pushButton_Open = self.widgetOpen.pushButton_Open
         pushButton_Open.clicked.connect(self.on_open_button_clicked)
         pushButton_Open.setEnabled(True)
         
@@ -1634,7 +1466,7 @@ class Player(QWidget):
         # Setup InfluxDB client
         self.influxdb_client = None
         self.write_api = None
-        settings = load_settings()
+        settings = get_settings()
         self.influxdb_url = settings.get("influxdb_url", "http://localhost:8086")
         self.influxdb_org = settings.get("influxdb_org", "fcclab")
         self.influxdb_bucket = settings.get("influxdb_bucket", "fcclab")
@@ -1648,17 +1480,18 @@ class Player(QWidget):
                     org=self.influxdb_org
                 )
                 self.write_api = self.influxdb_client.write_api(write_precision="s")
-                logger.info(f"Connected to InfluxDB at {self.influxdb_url}")
+                logger.info("Connected to InfluxDB at %s", self.influxdb_url)
                 # Enable publish button since InfluxDB is connected
                 self.widgetOpen.pushButton_Publish.setEnabled(True)
             except Exception as e:
-                logger.error(f"Failed to connect to InfluxDB: {e}")
+                logger.error("Failed to connect to InfluxDB: %s", e)
                 self.influxdb_client = None
                 self.write_api = None
         
         # Publishing state
         self.is_publishing_continuous = False
 
+    @pyqtSlot(float, float)
     def on_metrics_update(self, fps, bitrate):
         """Update FPS label and publish to DB."""
         # Update moving average history
@@ -1685,7 +1518,7 @@ class Player(QWidget):
         
         try:
             # Get stream name from combobox
-            comboBox_URL = self.widgetOpen.findChild(QComboBox, "comboBox_URL")
+            comboBox_URL = self.widgetOpen.comboBox_URL
             stream_name = comboBox_URL.currentText() if comboBox_URL else "unknown"
 
             # Use Point API
@@ -1704,7 +1537,7 @@ class Player(QWidget):
             )
 
         except Exception as e:
-            logger_temp.error(f"Failed to publish metrics to InfluxDB: {e}")
+            logger.error("Failed to publish metrics to InfluxDB: %s", e)
             if self.influxdb_client:
                 try:
                     self.influxdb_client.close()
@@ -1714,30 +1547,26 @@ class Player(QWidget):
             self.write_api = None
 
 
+    @pyqtSlot()
     def on_open_button_clicked(self):
         if self.widgetVideo.state == VideoState.STATE_OPEN or self.widgetVideo.state == VideoState.STATE_CONNECTING:
             self.widgetVideo.close_stream()
         else:
-            comboBox_URL = self.widgetOpen.findChild(QComboBox, "comboBox_URL")
-            index = comboBox_URL.currentIndex()
-            url = self.urls_list[index]
-            self.widgetVideo.open_stream(index)
+            self.widgetVideo.open_stream(self.widgetOpen.comboBox_URL.currentIndex())
     
+    @pyqtSlot()
     def on_record_button_clicked(self):
         """Handle record button click."""
         if self.widgetVideo.is_recording:
             # Immediately change button text to "Saving" when clicked
-            self.widgetOpen.pushButton_Record.setText("Saving...")
-            self.widgetOpen.pushButton_Record.setStyleSheet("background-color: orange; color: white;")
-            self.widgetOpen.pushButton_Record.setEnabled(False)
-            # Force UI update immediately - process events multiple times to ensure update
-            QApplication.processEvents()
-            QApplication.processEvents()
-            # Use QTimer to defer stop_recording slightly to ensure UI updates first
-            QTimer.singleShot(10, self.widgetVideo.stop_recording)
+            self.widgetOpen.sig_recording_changed("saving")
+            # Defer stop_recording until this handler returns, so the event loop
+            # paints the "Saving..." button before stop_recording blocks
+            QTimer.singleShot(0, self.widgetVideo.stop_recording)
         else:
             self.widgetVideo.start_recording()
 
+    @pyqtSlot()
     def on_publish_button_clicked(self):
         """Handle publish button click - toggle continuous publishing to InfluxDB."""
         if self.is_publishing_continuous:
@@ -1767,7 +1596,7 @@ class Player(QWidget):
                 self.show_status_message("Continuous publishing started", 2000)
                 logger.info("Continuous publishing to InfluxDB started")
             except Exception as e:
-                logger.error(f"Initial publish failed: {e}")
+                logger.error("Initial publish failed: %s", e)
                 self.show_status_message(f"Failed to start publishing: {str(e)}", 3000)
                 # Reset state on failure
                 self.is_publishing_continuous = False
@@ -1786,15 +1615,6 @@ class Player(QWidget):
                 from PyQt5.QtCore import QTimer
                 QTimer.singleShot(timeout_milliseconds, lambda: parent.statusBar().clearMessage())
 
-    def resizeEvent(self, event):
-        print(f"Player resized to: {event.size().width()}x{event.size().height()}")
-
-        self.widgetOpen.setGeometry(0, 0, self.width(), FONT_SIZE_PIXELS * 4)
-        self.frame_player.setGeometry(0, FONT_SIZE_PIXELS * 4, event.size().width(), event.size().height() - self.widgetOpen.height() - int(FONT_SIZE_PIXELS + FONT_SIZE_PIXELS/2))
-        self.widgetVideo.setGeometry(0, FONT_SIZE_PIXELS * 4, event.size().width(), event.size().height() - self.widgetOpen.height() - int(FONT_SIZE_PIXELS + FONT_SIZE_PIXELS/2))
-
-        super().resizeEvent(event)
-    
     def closeEvent(self, event):
         """Cleanup when Player is closed."""
         if self.influxdb_client:
@@ -1802,7 +1622,7 @@ class Player(QWidget):
                 self.influxdb_client.close()
                 logger.info("InfluxDB client closed")
             except Exception as e:
-                logger.error(f"Error closing InfluxDB client: {e}")
+                logger.error("Error closing InfluxDB client: %s", e)
         event.accept()
 
 class MainWindow(QMainWindow):
@@ -1811,15 +1631,16 @@ class MainWindow(QMainWindow):
         loadUi("ui/Live.ui", self)
 
         # Load settings
-        settings = load_settings()
+        settings = self._settings = get_settings()
         url_index = settings.get("url_index", 0)
         
         # Use global URLs (already loaded in main)
         self.player0 = Player(url_index, URLs)
-        self.layout().addWidget(self.player0)
+        # The central widget is sized by QMainWindow's layout, between the menu
+        # and status bars
+        self.setCentralWidget(self.player0)
 
         # self.player1 = Player()
-        # self.layout().addWidget(self.player1)
 
         self.statusBar().setStyleSheet("background-color: white;")
         self.show_status_bar("Ready")
@@ -1833,7 +1654,7 @@ class MainWindow(QMainWindow):
         if (saved_x is not None and saved_y is not None and 
             saved_width is not None and saved_height is not None):
             # Validate that the saved geometry is on a valid screen
-            screen_geometry = QDesktopWidget().availableGeometry()
+            screen_geometry = SCREEN_GEOM
             if (0 <= saved_x < screen_geometry.width() and 
                 0 <= saved_y < screen_geometry.height() and
                 saved_width > 0 and saved_height > 0):
@@ -1847,7 +1668,7 @@ class MainWindow(QMainWindow):
     
     def _set_default_geometry(self):
         """Set default centered window geometry."""
-        screen_geometry = QDesktopWidget().availableGeometry()
+        screen_geometry = SCREEN_GEOM
         screen_center_x = screen_geometry.width() // 2
         screen_center_y = screen_geometry.height() // 2
         window_width = int(1280 * FONT_SIZE_PIXELS / 20)
@@ -1861,24 +1682,18 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Save settings when window is closed."""
-        settings = load_settings()
+        settings = self._settings
         geometry = self.geometry()
         settings["window_x"] = geometry.x()
         settings["window_y"] = geometry.y()
         settings["window_width"] = geometry.width()
         settings["window_height"] = geometry.height()
         # Save current URLs
-        settings["urls"] = URLs
-        save_settings(settings)
+        settings["urls"] = [{"url": entry.url, "name": entry.name} for entry in URLs]
+        # self._settings is the shared cache: flushing it also cancels a pending debounced write
+        _flush_settings()
         event.accept()
 
-    def resizeEvent(self, event):
-        print(f"MainWindow resized to: {event.size().width()}x{event.size().height()}")
-        self.player0.setGeometry(0, 0, int(event.size().width()), int(event.size().height()))
-        # self.player0.setGeometry(0, 0, int(event.size().width()), int(event.size().height()/2))
-        # self.player1.setGeometry(0, int(event.size().height()/2), int(event.size().width()), int(event.size().height()/2))
-        super().resizeEvent(event)
-    
     def show_status_bar(self, message, timeout_miliseconds=None):
         self.statusBar().showMessage(message)
         if timeout_miliseconds is None:
@@ -1889,14 +1704,15 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
 
     FONT_SIZE_PIXELS = int(QWidget().font().pointSize() * app.primaryScreen().logicalDotsPerInch() / 72.0)
-    logger.info(f"FONT_SIZE_PIXELS: {FONT_SIZE_PIXELS}")
+    logger.info("FONT_SIZE_PIXELS: %s", FONT_SIZE_PIXELS)
+    # availableGeometry() round-trips to the window system: query it once
+    SCREEN_GEOM = app.primaryScreen().availableGeometry()
     
     # Load settings and initialize global URLs
     # load_settings() will automatically copy from default config if needed
-    settings = load_settings()
-    # Update the global URLs list
-    URLs.clear()
-    URLs.extend(settings.get("urls", []))
+    settings = get_settings()
+    # Update the global URLs table
+    URLs = parse_urls(settings.get("urls", []))
     
     window = MainWindow()
     window.show()
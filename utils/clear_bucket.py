@@ -10,25 +10,78 @@ Example: python3 clear_bucket.py fcclab
 import sys
 import os
 import argparse
+import atexit
+import functools
 import yaml
-from datetime import datetime, timezone
+from types import MappingProxyType
+from datetime import datetime, timedelta, timezone
 from influxdb_client import InfluxDBClient
 from influxdb_client.client.delete_api import DeleteApi
 
 # Config path: subsciber/stream_subscriber.yaml (relative to this script's parent)
 _CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "subsciber", "stream_subscriber.yaml")
-
+# Used for any key missing from the config file
+_DEFAULT_CFG = MappingProxyType({
+    "influxdb_url": "http://localhost:8086",
+    "influxdb_org": "fcclab",
+    "influxdb_token": "fcclab_token",
+})
+
+@functools.lru_cache(maxsize=1)
 def _load_config():
-    """Load InfluxDB config from stream_subscriber.yaml."""
-    defaults = {"influxdb_url": "http://localhost:8086", "influxdb_org": "fcclab", "influxdb_token": "fcclab_token"}
+    """Load InfluxDB config from stream_subscriber.yaml (parsed once per process)."""
+    cfg = {}
     if os.path.exists(_CONFIG_PATH):
         try:
             with open(_CONFIG_PATH) as f:
-                cfg = yaml.safe_load(f) or {}
-            return {k: cfg.get(k, v) for k, v in defaults.items()}
+                # libyaml's C loader when PyYAML was built with it
+                cfg = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
         except Exception:
-            pass
-    return defaults
+            cfg = {}
+    if not isinstance(cfg, dict):
+        cfg = {}
+    return {**_DEFAULT_CFG, **{k: cfg[k] for k in _DEFAULT_CFG if k in cfg}}
+
+# Shared by every clear_bucket() call in the process; closed at exit
+_client = None
+
+def _get_client(cfg):
+    """Return the process-wide InfluxDB client, connecting on first use."""
+    global _client
+    if _client is None:
+        _client = InfluxDBClient(
+            url=cfg["influxdb_url"],
+            token=cfg["influxdb_token"],
+            org=cfg["influxdb_org"],
+            enable_gzip=True
+        )
+        atexit.register(_close_client)
+    return _client
+
+def _close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+def _data_time_range(client, bucket_name, org):
+    """Return (earliest, latest) point time in the bucket, or None if it holds no data."""
+    query_api = client.query_api()
+    bucket = bucket_name.replace("\\", "\\\\").replace('"', '\\"')
+    bounds = []
+    for selector in ("first", "last"):
+        # Bare first()/last() per series is pushed down to storage; the
+        # min/max across series is taken here instead of in Flux
+        tables = query_api.query(
+            f'from(bucket: "{bucket}") |> range(start: 0) '
+            f'|> {selector}() |> keep(columns: ["_time"])',
+            org=org
+        )
+        times = [record.get_time() for table in tables for record in table.records]
+        if not times:
+            return None
+        bounds.append(min(times) if selector == "first" else max(times))
+    return bounds[0], bounds[1]
 
 def clear_bucket(bucket_name):
     """
@@ -41,15 +94,10 @@ def clear_bucket(bucket_name):
         bool: True if successful, False if failed
     """
     cfg = _load_config()
-    client = None
     try:
-        # Connect to InfluxDB
+        # Connect to InfluxDB (the client is reused across calls)
         print(f"Connecting to InfluxDB at {cfg['influxdb_url']}...")
-        client = InfluxDBClient(
-            url=cfg["influxdb_url"],
-            token=cfg["influxdb_token"],
-            org=cfg["influxdb_org"]
-        )
+        client = _get_client(cfg)
 
         # Verify connection
         health = client.health()
@@ -63,9 +111,19 @@ def clear_bucket(bucket_name):
         delete_api = client.delete_api()
 
         # Delete all data from the bucket
-        # Use a very wide time range to cover all possible data
+        # Limit the range to the data actually stored, so the server doesn't
+        # walk decades of empty shard groups; fall back to 1970 -> now
         start_time = datetime(1970, 1, 1, tzinfo=timezone.utc)
         stop_time = datetime.now(timezone.utc)
+        try:
+            data_range = _data_time_range(client, bucket_name, cfg["influxdb_org"])
+        except Exception as e:
+            print(f"⚠️  Could not query the bucket's time range ({e}), deleting 1970 -> now")
+            data_range = None
+        if data_range is not None:
+            start_time = data_range[0]
+            # Pad the stop so the newest point is inside the range
+            stop_time = data_range[1] + timedelta(seconds=1)
 
         print(f"🗑️  Clearing bucket '{bucket_name}'...")
         print(f"   Time range: {start_time} to {stop_time}")
@@ -86,10 +144,6 @@ def clear_bucket(bucket_name):
         print(f"❌ Failed to clear bucket '{bucket_name}': {str(e)}")
         return False
 
-    finally:
-        if client:
-            client.close()
-
 def main():
     """Main function to handle command line arguments and user interaction."""
     parser = argparse.ArgumentParser(
@@ -119,14 +173,20 @@ Examples:
 
     # Safety check - require explicit confirmation unless --yes is used
     if not args.yes:
+        # Nobody can answer the prompt: fail instead of blocking on input()
+        if not sys.stdin.isatty():
+            print("Refusing to prompt on non-TTY; pass --yes", file=sys.stderr)
+            sys.exit(2)
         cfg = _load_config()
-        print("==========================================")
-        print(f"Clearing InfluxDB bucket: {args.bucket_name}")
-        print("==========================================")
-        print(f"Organization: {cfg['influxdb_org']}")
-        print(f"InfluxDB URL: {cfg['influxdb_url']}")
-        print()
-        print(f"⚠️  WARNING: This will delete ALL data in bucket '{args.bucket_name}'")
+        sys.stdout.write("\n".join([
+            "==========================================",
+            f"Clearing InfluxDB bucket: {args.bucket_name}",
+            "==========================================",
+            f"Organization: {cfg['influxdb_org']}",
+            f"InfluxDB URL: {cfg['influxdb_url']}",
+            "",
+            f"⚠️  WARNING: This will delete ALL data in bucket '{args.bucket_name}'",
+        ]) + "\n")
         try:
             response = input("Are you sure you want to continue? (y/N): ").strip().lower()
             if response not in ['y', 'yes']: